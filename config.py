@@ -19,6 +19,56 @@ class PluginConfig:
         self.notify_groups = []
         self.enable_notification = True
         self.sign_status_filter = [0, 1, 2]  # 默认显示未上架、未开始、进行中
+        self.cache_ttl = 60  # 秒
+        self.cache_stale_ttl = 600  # 秒
+        self.http_connect_timeout = 5  # 秒
+        self.http_read_timeout = 15  # 秒
+        self.http_max_retries = 3
+        self.http_retry_base_delay = 0.5  # 秒
+        self.http_max_backoff = 30  # 秒
+        self.breaker_failure_threshold = 5
+        self.breaker_reset_timeout = 60  # 秒
+        self.http_pool_size = 20
+        self.http_pool_size_per_host = 8
+        self.http_keepalive_timeout = 60  # 秒
+        self.http_dns_cache_ttl = 300  # 秒
+        self.enable_request_tracing = False
+        self.stream_course_list = False
+        self.render_cache_max_items = 200
+        self.render_cache_max_mb = 100
+        self.enable_prerender = False
+        self.prerender_max_pages = 5
+        self.render_concurrency = 2
+        self.render_backend = "html"
+        self.native_font_path = ""
+        self.crawl_page_size = 200
+        self.crawl_concurrency = 4
+        self.crawl_max_pages = 50
+        self.incremental_polling = False
+        self.full_sync_interval = 60  # 分钟
+        self.adaptive_polling = False
+        self.min_check_interval = 1  # 分钟
+        self.max_check_interval = 30  # 分钟
+        self.sign_start_window = 10  # 分钟
+        self.enable_reminders = False
+        self.reminder_open_lead = 10  # 分钟
+        self.reminder_close_lead = 30  # 分钟
+        self.storage_backend = "json"
+        self.storage_durability = "file"
+        self.notify_change_types = []
+        self.journal_segment_kb = 1024
+        self.journal_max_segments = 8
+        self.send_concurrency = 5
+        self.send_rate_global = 5.0  # 条/秒
+        self.send_rate_per_platform = 3.0  # 条/秒
+        self.send_max_retries = 3
+        self.send_retry_base_delay = 1.0  # 秒
+        self.image_send_mode = "base64"
+        self.enable_cover_cache = True
+        self.cover_src_mode = "data_uri"
+        self.cover_cache_max_mb = 100
+        self.cover_prefetch_concurrency = 4
+        self.cover_negative_ttl = 360  # 分钟
         self._data = {}
 
         if initial_data is not None:
@@ -60,6 +110,56 @@ class PluginConfig:
         self.notify_groups = self._data.get("notify_groups", self.notify_groups)
         self.enable_notification = self._data.get("enable_notification", self.enable_notification)
         self.sign_status_filter = self._data.get("sign_status_filter", self.sign_status_filter)
+        self.cache_ttl = self._data.get("cache_ttl", self.cache_ttl)
+        self.cache_stale_ttl = self._data.get("cache_stale_ttl", self.cache_stale_ttl)
+        self.http_connect_timeout = self._data.get("http_connect_timeout", self.http_connect_timeout)
+        self.http_read_timeout = self._data.get("http_read_timeout", self.http_read_timeout)
+        self.http_max_retries = self._data.get("http_max_retries", self.http_max_retries)
+        self.http_retry_base_delay = self._data.get("http_retry_base_delay", self.http_retry_base_delay)
+        self.http_max_backoff = self._data.get("http_max_backoff", self.http_max_backoff)
+        self.breaker_failure_threshold = self._data.get("breaker_failure_threshold", self.breaker_failure_threshold)
+        self.breaker_reset_timeout = self._data.get("breaker_reset_timeout", self.breaker_reset_timeout)
+        self.http_pool_size = self._data.get("http_pool_size", self.http_pool_size)
+        self.http_pool_size_per_host = self._data.get("http_pool_size_per_host", self.http_pool_size_per_host)
+        self.http_keepalive_timeout = self._data.get("http_keepalive_timeout", self.http_keepalive_timeout)
+        self.http_dns_cache_ttl = self._data.get("http_dns_cache_ttl", self.http_dns_cache_ttl)
+        self.enable_request_tracing = self._data.get("enable_request_tracing", self.enable_request_tracing)
+        self.stream_course_list = self._data.get("stream_course_list", self.stream_course_list)
+        self.render_cache_max_items = self._data.get("render_cache_max_items", self.render_cache_max_items)
+        self.render_cache_max_mb = self._data.get("render_cache_max_mb", self.render_cache_max_mb)
+        self.enable_prerender = self._data.get("enable_prerender", self.enable_prerender)
+        self.prerender_max_pages = self._data.get("prerender_max_pages", self.prerender_max_pages)
+        self.render_concurrency = self._data.get("render_concurrency", self.render_concurrency)
+        self.render_backend = self._data.get("render_backend", self.render_backend)
+        self.native_font_path = self._data.get("native_font_path", self.native_font_path)
+        self.crawl_page_size = self._data.get("crawl_page_size", self.crawl_page_size)
+        self.crawl_concurrency = self._data.get("crawl_concurrency", self.crawl_concurrency)
+        self.crawl_max_pages = self._data.get("crawl_max_pages", self.crawl_max_pages)
+        self.incremental_polling = self._data.get("incremental_polling", self.incremental_polling)
+        self.full_sync_interval = self._data.get("full_sync_interval", self.full_sync_interval)
+        self.adaptive_polling = self._data.get("adaptive_polling", self.adaptive_polling)
+        self.min_check_interval = self._data.get("min_check_interval", self.min_check_interval)
+        self.max_check_interval = self._data.get("max_check_interval", self.max_check_interval)
+        self.sign_start_window = self._data.get("sign_start_window", self.sign_start_window)
+        self.enable_reminders = self._data.get("enable_reminders", self.enable_reminders)
+        self.reminder_open_lead = self._data.get("reminder_open_lead", self.reminder_open_lead)
+        self.reminder_close_lead = self._data.get("reminder_close_lead", self.reminder_close_lead)
+        self.storage_backend = self._data.get("storage_backend", self.storage_backend)
+        self.storage_durability = self._data.get("storage_durability", self.storage_durability)
+        self.notify_change_types = self._data.get("notify_change_types", self.notify_change_types)
+        self.journal_segment_kb = self._data.get("journal_segment_kb", self.journal_segment_kb)
+        self.journal_max_segments = self._data.get("journal_max_segments", self.journal_max_segments)
+        self.send_concurrency = self._data.get("send_concurrency", self.send_concurrency)
+        self.send_rate_global = self._data.get("send_rate_global", self.send_rate_global)
+        self.send_rate_per_platform = self._data.get("send_rate_per_platform", self.send_rate_per_platform)
+        self.send_max_retries = self._data.get("send_max_retries", self.send_max_retries)
+        self.send_retry_base_delay = self._data.get("send_retry_base_delay", self.send_retry_base_delay)
+        self.image_send_mode = self._data.get("image_send_mode", self.image_send_mode)
+        self.enable_cover_cache = self._data.get("enable_cover_cache", self.enable_cover_cache)
+        self.cover_src_mode = self._data.get("cover_src_mode", self.cover_src_mode)
+        self.cover_cache_max_mb = self._data.get("cover_cache_max_mb", self.cover_cache_max_mb)
+        self.cover_prefetch_concurrency = self._data.get("cover_prefetch_concurrency", self.cover_prefetch_concurrency)
+        self.cover_negative_ttl = self._data.get("cover_negative_ttl", self.cover_negative_ttl)
 
     def merge(self, data) -> None:
         self._merge_data(data)
@@ -76,6 +176,56 @@ class PluginConfig:
             "notify_groups": self.notify_groups,
             "enable_notification": self.enable_notification,
             "sign_status_filter": self.sign_status_filter,
+            "cache_ttl": self.cache_ttl,
+            "cache_stale_ttl": self.cache_stale_ttl,
+            "http_connect_timeout": self.http_connect_timeout,
+            "http_read_timeout": self.http_read_timeout,
+            "http_max_retries": self.http_max_retries,
+            "http_retry_base_delay": self.http_retry_base_delay,
+            "http_max_backoff": self.http_max_backoff,
+            "breaker_failure_threshold": self.breaker_failure_threshold,
+            "breaker_reset_timeout": self.breaker_reset_timeout,
+            "http_pool_size": self.http_pool_size,
+            "http_pool_size_per_host": self.http_pool_size_per_host,
+            "http_keepalive_timeout": self.http_keepalive_timeout,
+            "http_dns_cache_ttl": self.http_dns_cache_ttl,
+            "enable_request_tracing": self.enable_request_tracing,
+            "stream_course_list": self.stream_course_list,
+            "render_cache_max_items": self.render_cache_max_items,
+            "render_cache_max_mb": self.render_cache_max_mb,
+            "enable_prerender": self.enable_prerender,
+            "prerender_max_pages": self.prerender_max_pages,
+            "render_concurrency": self.render_concurrency,
+            "render_backend": self.render_backend,
+            "native_font_path": self.native_font_path,
+            "crawl_page_size": self.crawl_page_size,
+            "crawl_concurrency": self.crawl_concurrency,
+            "crawl_max_pages": self.crawl_max_pages,
+            "incremental_polling": self.incremental_polling,
+            "full_sync_interval": self.full_sync_interval,
+            "adaptive_polling": self.adaptive_polling,
+            "min_check_interval": self.min_check_interval,
+            "max_check_interval": self.max_check_interval,
+            "sign_start_window": self.sign_start_window,
+            "enable_reminders": self.enable_reminders,
+            "reminder_open_lead": self.reminder_open_lead,
+            "reminder_close_lead": self.reminder_close_lead,
+            "storage_backend": self.storage_backend,
+            "storage_durability": self.storage_durability,
+            "notify_change_types": self.notify_change_types,
+            "journal_segment_kb": self.journal_segment_kb,
+            "journal_max_segments": self.journal_max_segments,
+            "send_concurrency": self.send_concurrency,
+            "send_rate_global": self.send_rate_global,
+            "send_rate_per_platform": self.send_rate_per_platform,
+            "send_max_retries": self.send_max_retries,
+            "send_retry_base_delay": self.send_retry_base_delay,
+            "image_send_mode": self.image_send_mode,
+            "enable_cover_cache": self.enable_cover_cache,
+            "cover_src_mode": self.cover_src_mode,
+            "cover_cache_max_mb": self.cover_cache_max_mb,
+            "cover_prefetch_concurrency": self.cover_prefetch_concurrency,
+            "cover_negative_ttl": self.cover_negative_ttl,
         }
 
 
@@ -1,18 +1,48 @@
 # /astrbot_plugin_class2_notify/handlers/chat_handler.py
 
+import json
+import asyncio
+import hashlib
+from typing import List, Dict, Any, Optional
 from astrbot.api.event import AstrMessageEvent
-from astrbot.api import html_renderer
 from astrbot.core import logger
-from ..services import Class2API
+from ..services import (
+    Class2API,
+    CourseIndex,
+    CourseQuery,
+    CoverCache,
+    RenderCache,
+    RenderQueue,
+    SearchIndex,
+)
 from ..utils.templates import COURSE_LIST_TEMPLATE
 
 
 class ChatHandler:
     """聊天处理器：负责处理用户的课程查询请求"""
 
-    def __init__(self, config, api_service: Class2API):
+    ITEMS_PER_PAGE = 10  # 每页显示10条
+    SEARCH_RESULTS = 10  # 搜索最多显示10条
+    MAX_KEYWORD_LENGTH = 50
+    PRERENDER_PAGE_DELAY = 0.5  # 预渲染每页之间的间隔（秒），让出渲染器给用户查询
+
+    def __init__(
+        self,
+        config,
+        api_service: Class2API,
+        render_cache: RenderCache,
+        cover_cache: CoverCache,
+        course_index: CourseIndex,
+        search_index: SearchIndex,
+    ):
         self.config = config
         self.api_service = api_service
+        self.render_cache = render_cache
+        self.cover_cache = cover_cache
+        self.course_index = course_index
+        self.search_index = search_index
+        self._prerender_digest = None
+        self._prerender_lock = asyncio.Lock()
 
     def _prepare_course_data(self, course: dict) -> dict:
         """
@@ -24,80 +54,119 @@ class ChatHandler:
         Returns:
             格式化后的课程数据
         """
-        sign_status = course.get("sign_status", -1)
-
-        # 格式化报名时间
-        sign_time = None
-        if course.get("sign_start_time") and course.get("sign_end_time"):
-            sign_time = f"{course['sign_start_time']} ~ {course['sign_end_time']}"
-
-        # 格式化活动时间
-        activity_time = None
-        if course.get("sign_in_start_time") and course.get("sign_out_end_time"):
-            activity_time = (
-                f"{course['sign_in_start_time']} ~ {course['sign_out_end_time']}"
-            )
+        data = self.api_service.course_model(course).view()
+        return {**data, "cover_url": self.cover_cache.resolve(data["cover_url"])}
 
-        # 计算剩余名额
-        remaining = 0
-        show_people_info = False
-        if course.get("course_apply_count") is not None and course.get("max"):
-            remaining = course["max"] - course["course_apply_count"]
-            show_people_info = True
+    async def _build_template_data(
+        self,
+        filtered_courses: List[Dict[str, Any]],
+        page: int,
+    ) -> Dict[str, Any]:
+        """
+        构建指定页的模板数据
 
-        # 处理时间地点
-        time_place = None
-        if course.get("time_place"):
-            time_place = course["time_place"].replace("\r\n", " ").replace("\n", " ")
+        Args:
+            filtered_courses: 已筛选排序的课程列表
+            page: 页码（调用方保证在有效范围内）
+
+        Returns:
+            模板数据
+        """
+        total_filtered = len(filtered_courses)
+        total_pages = (total_filtered + self.ITEMS_PER_PAGE - 1) // self.ITEMS_PER_PAGE
+        start_idx = (page - 1) * self.ITEMS_PER_PAGE
+        page_courses = filtered_courses[start_idx:start_idx + self.ITEMS_PER_PAGE]
+        await self.cover_cache.load(course.get("cover_url") for course in page_courses)
 
         return {
-            "id": course.get("id", ""),
-            "title": course.get("title", "未知课程"),
-            "cover_url": course.get("cover_url", ""),
-            "sign_status": sign_status,
-            "status_text": self.api_service.SIGN_STATUS_MAP.get(sign_status, "未知"),
-            "category": course.get("transcript_index", {}).get("transcript_name", ""),
-            "type": course.get("transcript_index_type", {}).get(
-                "transcript_type_name", ""
-            ),
-            "score": course.get("score", 0),
-            "department": course.get("department", ""),
-            "sign_time": sign_time,
-            "activity_time": activity_time,
-            "time_place": time_place,
-            "apply_count": course.get("course_apply_count", 0),
-            "max_people": course.get("max", 0),
-            "remaining": remaining,
-            "show_people_info": show_people_info,
-            "completion": course.get("completion_flag_text", ""),
-            "connect": course.get("connect", ""),
+            "courses": [self._prepare_course_data(course) for course in page_courses],
+            "total_count": total_filtered,
+            "total_pages": total_pages,
+            "current_page": page,
+            "display_count": len(page_courses),
         }
 
+    async def prerender_pages(
+        self,
+        all_courses: List[Dict[str, Any]],
+        events: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """
+        预渲染查询结果的各页图片，供 /第二课堂 [页码] 直接命中缓存
+
+        筛选后的课程列表内容未变化时跳过；每页之间主动让出，避免占用渲染器。
+
+        Args:
+            all_courses: 最新获取的全部课程
+            events: 本轮变化事件（未使用，按内容摘要判断是否需要重新渲染）
+        """
+        if not self.config.enable_prerender:
+            return
+
+        if self._prerender_lock.locked():
+            logger.debug("上一次预渲染尚未完成，跳过本次预渲染")
+            return
+
+        async with self._prerender_lock:
+            self.course_index.sync(all_courses)
+            filtered_courses = self.course_index.query(
+                CourseQuery(), self.config.sign_status_filter
+            )
+            digest = hashlib.sha256(
+                json.dumps(filtered_courses, ensure_ascii=False, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            if digest == self._prerender_digest:
+                logger.debug("课程列表未变化，跳过预渲染")
+                return
+
+            total_pages = (len(filtered_courses) + self.ITEMS_PER_PAGE - 1) // self.ITEMS_PER_PAGE
+            page_count = min(total_pages, self.config.prerender_max_pages)
+            for page in range(1, page_count + 1):
+                try:
+                    await self.render_cache.render(
+                        COURSE_LIST_TEMPLATE,
+                        await self._build_template_data(filtered_courses, page),
+                        options={"full_page": True},
+                        priority=RenderQueue.WARMUP,
+                    )
+                except Exception as e:
+                    logger.error(f"预渲染第{page}页失败: {e}")
+                    return
+                await asyncio.sleep(self.PRERENDER_PAGE_DELAY)
+
+            self._prerender_digest = digest
+            logger.info(f"已预渲染课程列表 {page_count}/{total_pages} 页")
+
     async def process_course_query(
         self,
         event: AstrMessageEvent,
-        page: int = 1,
+        query: Optional[CourseQuery] = None,
     ):
         """
         处理课程查询请求
 
         Args:
             event: 消息事件
-            page: 页码，默认第1页
+            query: 筛选条件和页码，默认按配置的状态过滤并显示第1页
 
         Yields:
             处理结果消息
         """
-        # 使用配置的状态过滤
+        query = query or CourseQuery()
+        page = query.page
+        # 未指定状态时使用配置的状态过滤
         status_list = self.config.sign_status_filter
-        items_per_page = 10  # 每页显示10条
+        items_per_page = self.ITEMS_PER_PAGE
 
         # 获取课程列表
-        yield event.plain_result(f"正在查询第二课堂课程（第{page}页）...")
+        if query.has_filters:
+            yield event.plain_result(f"正在查询第二课堂课程（{query.describe()}，第{page}页）...")
+        else:
+            yield event.plain_result(f"正在查询第二课堂课程（第{page}页）...")
 
         try:
-            # 获取足够多的数据以便过滤（这里获取前200条）
-            response = await self.api_service.get_course_list(page=1, limit=200)
+            # 获取全部课程以便过滤（优先使用监控轮询刷新的缓存）
+            response = await self.api_service.fetch_all_courses()
 
             if not response or not response.get("data"):
                 yield event.plain_result("获取课程列表失败，请稍后重试。")
@@ -109,12 +178,17 @@ class ChatHandler:
                 yield event.plain_result("暂无课程数据。")
                 return
 
-            # 根据状态筛选课程
-            filtered_courses = self.api_service.filter_courses_by_status(
-                all_courses, status_list
-            )
+            # 通过索引筛选课程
+            self.course_index.sync(all_courses)
+            filtered_courses = self.course_index.query(query, status_list)
 
             if not filtered_courses:
+                if query.has_filters:
+                    yield event.plain_result(
+                        f"没有找到符合条件（{query.describe()}）的课程。\n"
+                        f"当前共有 {len(all_courses)} 个课程。"
+                    )
+                    return
                 status_names = [
                     self.api_service.SIGN_STATUS_MAP.get(s, str(s)) for s in status_list
                 ]
@@ -141,27 +215,17 @@ class ChatHandler:
             page_courses = filtered_courses[start_idx:end_idx]
 
             # 准备渲染数据
-            courses_data = [
-                self._prepare_course_data(course)
-                for course in page_courses
-            ]
-
-            template_data = {
-                "courses": courses_data,
-                "total_count": total_filtered,
-                "total_pages": total_pages,
-                "current_page": page,
-                "display_count": len(page_courses),
-            }
-
-            # 使用 HTML 模板渲染
+            template_data = await self._build_template_data(filtered_courses, page)
+
+            # 使用 HTML 模板渲染，相同数据直接复用缓存的图片
             try:
-                image_url = await html_renderer.render_custom_template(
+                image_path = await self.render_cache.render(
                     COURSE_LIST_TEMPLATE,
                     template_data,
                     options={"full_page": True},
+                    priority=RenderQueue.QUERY,
                 )
-                yield event.image_result(image_url)
+                yield event.image_result(image_path)
 
             except Exception as e:
                 logger.error(f"生成课程列表图片失败: {e}")
@@ -179,3 +243,52 @@ class ChatHandler:
         except Exception as e:
             logger.error(f"查询课程失败: {e}")
             yield event.plain_result("查询课程时出现错误，请稍后重试。")
+
+    async def process_course_search(self, event: AstrMessageEvent, keyword: str):
+        """
+        处理课程搜索请求
+
+        Args:
+            event: 消息事件
+            keyword: 搜索关键词
+
+        Yields:
+            处理结果消息
+        """
+        keyword = keyword.strip()[:self.MAX_KEYWORD_LENGTH]
+        if not keyword:
+            yield event.plain_result("请输入搜索关键词！\n例如：/第二课堂搜索 讲座")
+            return
+
+        try:
+            await self.search_index.load()
+            if not len(self.search_index):
+                # 监控未运行时索引为空，先用当前课程列表建立索引
+                response = await self.api_service.fetch_all_courses()
+                if not response or not response.get("data"):
+                    yield event.plain_result("获取课程列表失败，请稍后重试。")
+                    return
+                await self.search_index.on_update(response["data"].get("items", []), None)
+
+            total, results = self.search_index.search(keyword, self.SEARCH_RESULTS)
+            if not results:
+                yield event.plain_result(f"没有找到与“{keyword}”相关的课程。")
+                return
+
+            message = f"🔍 搜索“{keyword}”：共 {total} 个结果"
+            if total > len(results):
+                message += f"（显示前 {len(results)} 个）"
+            message += "\n\n"
+            for idx, (_, doc) in enumerate(results, 1):
+                course_id, sign_status, title, category, department, time_place = doc
+                status_text = self.api_service.SIGN_STATUS_MAP.get(sign_status, "未知")
+                details = " | ".join(part for part in (status_text, category, department) if part)
+                message += f"{idx}. {title}\n   {details}\n"
+                if time_place:
+                    message += f"   📍 {time_place}\n"
+                message += f"   🆔 {course_id}\n\n"
+            yield event.plain_result(message.rstrip())
+
+        except Exception as e:
+            logger.error(f"搜索课程失败: {e}")
+            yield event.plain_result("搜索课程时出现错误，请稍后重试。")
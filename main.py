@@ -5,7 +5,19 @@ from astrbot.api.star import Context, Star, register
 from astrbot.core import logger
 
 from .config import load_config
-from .services import Class2API, CourseStorage, SchedulerService
+from .services import (
+    Class2API,
+    CourseStorage,
+    CourseIndex,
+    CourseQuery,
+    CoverCache,
+    NativeRenderer,
+    RenderCache,
+    RenderQueue,
+    SchedulerService,
+    SearchIndex,
+    SQLiteCourseStorage,
+)
 from .handlers import ChatHandler
 
 
@@ -23,31 +35,71 @@ class Class2Notify(Star):
 
         # 2. 初始化服务层
         self.api_service = Class2API(self.config)
-        self.storage_service = CourseStorage()
+        if self.config.storage_backend == "sqlite":
+            self.storage_service = SQLiteCourseStorage(self.config)
+        else:
+            self.storage_service = CourseStorage(self.config)
+        self.render_queue = RenderQueue(self.config)
+        self.native_renderer = NativeRenderer(self.config)
+        self.render_cache = RenderCache(self.config, self.render_queue, self.native_renderer)
+        self.cover_cache = CoverCache(self.config)
+        self.course_index = CourseIndex(self.api_service)
+        self.search_index = SearchIndex(self.config, self.api_service)
         
         # 3. 初始化调度服务
         self.scheduler_service = SchedulerService(
             self.context,
             self.config,
             self.api_service,
-            self.storage_service
+            self.storage_service,
+            self.render_cache,
+            self.cover_cache,
         )
 
         # 4. 初始化处理器层
-        self.chat_handler = ChatHandler(self.config, self.api_service)
+        self.chat_handler = ChatHandler(
+            self.config,
+            self.api_service,
+            self.render_cache,
+            self.cover_cache,
+            self.course_index,
+            self.search_index,
+        )
+        self.scheduler_service.add_update_listener(self.course_index.on_update)
+        self.scheduler_service.add_update_listener(self.search_index.on_update)
+        self.scheduler_service.add_update_listener(self.chat_handler.prerender_pages)
 
         # 5. 启动课程监控任务
         self.scheduler_service.start_monitoring()
 
+    @staticmethod
+    def _command_args(event: AstrMessageEvent, *names: str) -> list:
+        """取出命令名之后的全部参数"""
+        tokens = event.message_str.split()
+        if tokens and tokens[0].lstrip("/") in names:
+            tokens = tokens[1:]
+        return tokens
+
     @filter.command("第二课堂", alias={"class2"})
     async def query_courses(self, event: AstrMessageEvent, page: str = "1"):
         """查询第二课堂课程"""
         try:
-            page_num = max(1, int(page))  # 确保页码至少为1
-            async for result in self.chat_handler.process_course_query(event, page_num):
-                yield result
-        except ValueError:
-            yield event.plain_result("页码必须是正整数！\n例如：/第二课堂 2 表示查看第2页")
+            query = CourseQuery.parse(self._command_args(event, "第二课堂", "class2"))
+        except ValueError as e:
+            yield event.plain_result(
+                f"{e}\n例如：/第二课堂 2 表示查看第2页，"
+                "/第二课堂 状态=2 分类=志愿 积分>=2 页=3 按条件筛选"
+            )
+            return
+        async for result in self.chat_handler.process_course_query(event, query):
+            yield result
+
+    @filter.command("第二课堂搜索", alias={"class2search"})
+    async def search_courses(self, event: AstrMessageEvent, keyword: str = ""):
+        """按关键词搜索第二课堂课程"""
+        keyword = " ".join(self._command_args(event, "第二课堂搜索", "class2search"))
+        async for result in self.chat_handler.process_course_search(event, keyword):
+            yield result
 
     @filter.command("help", alias={"帮助"})
     async def help(self, event: AstrMessageEvent):
@@ -59,7 +111,14 @@ class Class2Notify(Star):
             "  示例：\n"
             "    /第二课堂      # 查询第1页课程\n"
             "    /第二课堂 2    # 查询第2页课程\n"
-            "    /第二课堂 3    # 查询第3页课程\n\n"
+            "    /第二课堂 3    # 查询第3页课程\n"
+            "  筛选条件（可组合）：\n"
+            "    状态=2 或 状态=进行中,未开始 或 状态=全部\n"
+            "    分类=志愿  类型=讲座  主办=团委\n"
+            "    积分>=2（支持 = > < >= <=）  页=3\n"
+            "  示例：/第二课堂 状态=2 分类=志愿 积分>=2 页=3\n\n"
+            "/第二课堂搜索 <关键词> - 按标题、分类、主办单位和时间地点搜索课程\n"
+            "  示例：/第二课堂搜索 讲座\n\n"
             "💡 当有新课程上线时，会自动推送到配置的群组"
         )
         yield event.plain_result(help_text)
@@ -68,4 +127,10 @@ class Class2Notify(Star):
         """插件卸载时的清理操作"""
         await self.scheduler_service.stop_monitoring()
         await self.api_service.close()
+        await self.cover_cache.close()
+        await self.search_index.save()
+        self.native_renderer.close()
+        await self.storage_service.flush()
+        self.storage_service.close()
+        logger.info(f"渲染队列统计: {self.render_queue.stats()}")
         logger.info("第二课堂通知插件已卸载")
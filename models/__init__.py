@@ -0,0 +1,8 @@
+# /astrbot_plugin_class2_notify/models/__init__.py
+
+from .course import Course, CourseStatus
+
+__all__ = [
+    "Course",
+    "CourseStatus",
+]
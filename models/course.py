@@ -0,0 +1,218 @@
+# /astrbot_plugin_class2_notify/models/course.py
+
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Union
+from ..utils.time_utils import parse_timestamp
+
+
+class CourseStatus(IntEnum):
+    """课程报名状态 (sign_status)"""
+
+    UNLISTED = 0
+    NOT_STARTED = 1
+    OPEN = 2
+    ENDED = 3
+    DELISTED = 4
+
+    @property
+    def label(self) -> str:
+        return _STATUS_LABELS[self]
+
+
+_STATUS_LABELS = {
+    CourseStatus.UNLISTED: "未上架",
+    CourseStatus.NOT_STARTED: "未开始",
+    CourseStatus.OPEN: "进行中",
+    CourseStatus.ENDED: "已结束",
+    CourseStatus.DELISTED: "已下架",
+}
+
+_STATUS_EMOJI = {
+    CourseStatus.OPEN: "🟢",
+    CourseStatus.NOT_STARTED: "🟡",
+    CourseStatus.UNLISTED: "⚪",
+}
+
+# 时间字段：可解析时保存为Unix时间戳（用于比较和排序），否则保留原文
+TimeValue = Union[int, str, None]
+
+
+def _to_epoch(value: Any) -> TimeValue:
+    if not value:
+        return None
+    timestamp = parse_timestamp(value)
+    if timestamp is None:
+        return str(value)
+    return int(timestamp)
+
+
+def _time_range(start: Any, end: Any) -> Optional[str]:
+    """按API原文显示时间段，两端都有值时才显示"""
+    if not start or not end:
+        return None
+    return f"{start} ~ {end}"
+
+class Course:
+    """
+    课程模型：从API返回的原始字典解析一次，供渲染和文本输出共用
+
+    时间字段保存为Unix时间戳供比较和排序，显示时使用API原文；
+    状态保存为 CourseStatus（未知状态保留原值），
+    模板数据和Markdown文本在首次使用时生成并缓存。
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "cover_url",
+        "status",
+        "category",
+        "type_name",
+        "score",
+        "department",
+        "time_place",
+        "sign_start",
+        "sign_end",
+        "sign_in_start",
+        "sign_out_end",
+        "sign_time",
+        "activity_time",
+        "apply_count",
+        "max_people",
+        "completion",
+        "connect",
+        "_view",
+        "_text_lines",
+    )
+
+    def __init__(self, **fields: Any):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_dict(cls, course: Dict[str, Any]) -> "Course":
+        """
+        从API返回的课程字典解析
+
+        Args:
+            course: 原始课程数据
+
+        Returns:
+            课程模型
+        """
+        sign_status = course.get("sign_status", -1)
+        try:
+            status: Union[CourseStatus, int] = CourseStatus(sign_status)
+        except ValueError:
+            status = sign_status
+
+        time_place = course.get("time_place")
+        if time_place:
+            time_place = time_place.replace("\r\n", " ").replace("\n", " ")
+
+        return cls(
+            id=course.get("id", ""),
+            title=course.get("title", "未知课程"),
+            cover_url=course.get("cover_url", ""),
+            status=status,
+            category=(course.get("transcript_index") or {}).get("transcript_name", ""),
+            type_name=(course.get("transcript_index_type") or {}).get("transcript_type_name", ""),
+            score=course.get("score", 0),
+            department=course.get("department", ""),
+            time_place=time_place or None,
+            sign_start=_to_epoch(course.get("sign_start_time")),
+            sign_end=_to_epoch(course.get("sign_end_time")),
+            sign_in_start=_to_epoch(course.get("sign_in_start_time")),
+            sign_out_end=_to_epoch(course.get("sign_out_end_time")),
+            sign_time=_time_range(course.get("sign_start_time"), course.get("sign_end_time")),
+            activity_time=_time_range(course.get("sign_in_start_time"), course.get("sign_out_end_time")),
+            apply_count=course.get("course_apply_count"),
+            max_people=course.get("max", 0),
+            completion=course.get("completion_flag_text", ""),
+            connect=course.get("connect", ""),
+        )
+
+    @property
+    def status_text(self) -> str:
+        if isinstance(self.status, CourseStatus):
+            return self.status.label
+        return "未知"
+
+    @property
+    def show_people_info(self) -> bool:
+        return self.apply_count is not None and bool(self.max_people)
+
+    @property
+    def remaining(self) -> int:
+        return self.max_people - self.apply_count if self.show_people_info else 0
+
+    def view(self) -> Dict[str, Any]:
+        """
+        模板渲染用的课程数据（首次调用时生成并缓存）
+
+        cover_url 为原始地址，由调用方按封面缓存替换。
+        """
+        if self._view is None:
+            self._view = {
+                "id": self.id,
+                "title": self.title,
+                "cover_url": self.cover_url,
+                "sign_status": int(self.status) if isinstance(self.status, CourseStatus) else self.status,
+                "status_text": self.status_text,
+                "category": self.category,
+                "type": self.type_name,
+                "score": self.score,
+                "department": self.department,
+                "sign_time": self.sign_time,
+                "activity_time": self.activity_time,
+                "time_place": self.time_place,
+                "apply_count": self.apply_count or 0,
+                "max_people": self.max_people,
+                "remaining": self.remaining,
+                "show_people_info": self.show_people_info,
+                "completion": self.completion,
+                "connect": self.connect,
+            }
+        return self._view
+
+    def markdown(self, index: int = 0) -> str:
+        """
+        格式化为Markdown文本
+
+        Args:
+            index: 序号（用于列表显示），为0时不显示序号
+
+        Returns:
+            Markdown文本
+        """
+        if self._text_lines is None:
+            self._text_lines = self._build_text_lines()
+        title = f"## {index}. {self.title}" if index > 0 else f"## {self.title}"
+        return "\n\n".join([title, *self._text_lines])
+
+    def _build_text_lines(self) -> List[str]:
+        emoji = _STATUS_EMOJI.get(self.status, "🔴")
+        lines = [f"**状态**: {emoji} {self.status_text}"]
+        if self.id:
+            lines.append(f"**🆔 ID**: {self.id}")
+        if self.category:
+            lines.append(f"**📂 分类**: {self.category}")
+        if self.type_name:
+            lines.append(f"**🏷️ 类型**: {self.type_name}")
+        if self.sign_time:
+            lines.append(f"**📅 报名时间**: {self.sign_time}")
+        if self.activity_time:
+            lines.append(f"**🕐 活动时间**: {self.activity_time}")
+        if self.time_place:
+            lines.append(f"**⏰ 时间地点**: {self.time_place}")
+        if self.show_people_info:
+            lines.append(f"**👥 人数**: {self.apply_count}/{self.max_people} (剩余: {self.remaining})")
+        if self.score:
+            lines.append(f"**⭐ 积分**: {self.score} 分")
+        if self.completion:
+            lines.append(f"**✅ 完成**: {self.completion}")
+        if self.department:
+            lines.append(f"**🏢 主办**: {self.department}")
+        if self.connect:
+            lines.append(f"**📞 联系**: {self.connect}")
+        return lines
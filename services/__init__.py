@@ -1,11 +1,26 @@
 # /astrbot_plugin_class2_notify/services/__init__.py
 
 from .class2_api import Class2API
+from .course_index import CourseIndex, CourseQuery
 from .course_storage import CourseStorage
+from .cover_cache import CoverCache
+from .native_renderer import NativeRenderer
+from .render_cache import RenderCache
+from .render_queue import RenderQueue
+from .search_index import SearchIndex
+from .sqlite_storage import SQLiteCourseStorage
 from .scheduler_service import SchedulerService
 
 __all__ = [
     "Class2API",
+    "CourseIndex",
+    "CourseQuery",
     "CourseStorage",
+    "CoverCache",
+    "NativeRenderer",
+    "RenderCache",
+    "RenderQueue",
+    "SearchIndex",
+    "SQLiteCourseStorage",
     "SchedulerService",
 ]
@@ -0,0 +1,125 @@
+# /astrbot_plugin_class2_notify/services/change_detector.py
+
+import json
+import hashlib
+from typing import List, Dict, Any, Tuple
+
+
+class ChangeDetector:
+    """课程变化检测：比较每个课程的字段指纹，只对指纹变化的课程做逐字段对比"""
+
+    # 事件类型
+    ADDED = "added"
+    REMOVED = "removed"
+    STATUS_CHANGED = "status_changed"
+    SEATS_REOPENED = "seats_reopened"
+    TIME_CHANGED = "time_changed"
+    UPDATED = "updated"
+
+    # 参与指纹计算的字段
+    WATCHED_FIELDS = (
+        "sign_status",
+        "course_apply_count",
+        "max",
+        "sign_start_time",
+        "sign_end_time",
+        "sign_in_start_time",
+        "sign_out_end_time",
+        "title",
+        "time_place",
+        "score",
+    )
+
+    TIME_FIELDS = (
+        "sign_start_time",
+        "sign_end_time",
+        "sign_in_start_time",
+        "sign_out_end_time",
+    )
+
+    @classmethod
+    def fingerprint(cls, course: Dict[str, Any]) -> bytes:
+        """
+        计算课程的字段指纹
+
+        Args:
+            course: 课程数据
+
+        Returns:
+            8字节摘要
+        """
+        values = [course.get(field) for field in cls.WATCHED_FIELDS]
+        payload = json.dumps(values, ensure_ascii=False, separators=(",", ":"), default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest()
+
+    @staticmethod
+    def remaining_seats(course: Dict[str, Any]) -> int:
+        """剩余名额，未设置人数上限时返回0"""
+        if course.get("course_apply_count") is None or not course.get("max"):
+            return 0
+        return course["max"] - course["course_apply_count"]
+
+    @classmethod
+    def diff(
+        cls,
+        old_courses: Dict[Any, Dict[str, Any]],
+        old_fingerprints: Dict[Any, bytes],
+        new_courses: List[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], Dict[Any, bytes]]:
+        """
+        对比新旧快照，产出变化事件
+
+        Args:
+            old_courses: 旧快照 ID -> 课程
+            old_fingerprints: 旧快照 ID -> 指纹
+            new_courses: 新课程列表
+
+        Returns:
+            (事件列表, 新快照 ID -> 指纹)
+        """
+        events: List[Dict[str, Any]] = []
+        new_fingerprints: Dict[Any, bytes] = {}
+
+        for course in new_courses:
+            course_id = course.get("id")
+            if not course_id:
+                continue
+            fingerprint = cls.fingerprint(course)
+            new_fingerprints[course_id] = fingerprint
+
+            old = old_courses.get(course_id)
+            if old is None:
+                events.append({"type": cls.ADDED, "course_id": course_id, "course": course})
+                continue
+            if old_fingerprints.get(course_id) == fingerprint:
+                continue
+            events.extend(cls._field_events(old, course))
+
+        for course_id, old in old_courses.items():
+            if course_id not in new_fingerprints:
+                events.append({"type": cls.REMOVED, "course_id": course_id, "course": old})
+
+        return events, new_fingerprints
+
+    @classmethod
+    def _field_events(cls, old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """逐字段对比单个课程，产出对应类型的事件"""
+        changes = {
+            field: (old.get(field), new.get(field))
+            for field in cls.WATCHED_FIELDS
+            if old.get(field) != new.get(field)
+        }
+        if not changes:
+            return []
+
+        base = {"course_id": new.get("id"), "course": new, "old": old, "changes": changes}
+        events = []
+        if "sign_status" in changes:
+            events.append(dict(base, type=cls.STATUS_CHANGED))
+        if cls.remaining_seats(old) <= 0 < cls.remaining_seats(new):
+            events.append(dict(base, type=cls.SEATS_REOPENED))
+        if any(field in changes for field in cls.TIME_FIELDS):
+            events.append(dict(base, type=cls.TIME_CHANGED))
+        if not events:
+            events.append(dict(base, type=cls.UPDATED))
+        return events
@@ -0,0 +1,102 @@
+# /astrbot_plugin_class2_notify/services/circuit_breaker.py
+
+import time
+from typing import Dict
+from astrbot.core import logger
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开时拒绝请求"""
+
+
+class CircuitBreaker:
+    """
+    熔断器：连续失败达到阈值后打开，在冷却期内直接拒绝请求；
+    冷却结束后进入半开状态放行一个试探请求，成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        # 指标
+        self.rejected = 0
+        self.transitions: Dict[str, int] = {self.CLOSED: 0, self.OPEN: 0, self.HALF_OPEN: 0}
+
+    def _transition(self, state: str, reason: str):
+        if state == self.state:
+            return
+        logger.warning(f"熔断器 {self.name}: {self.state} -> {state}（{reason}）")
+        self.state = state
+        self.transitions[state] += 1
+        if state == self.CLOSED:
+            logger.info(f"熔断器 {self.name} 已恢复: {self.stats()}")
+
+    @property
+    def is_open(self) -> bool:
+        """是否处于打开状态且仍在冷却期内（此时请求会被直接拒绝）"""
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """
+        判断是否放行请求
+
+        Returns:
+            是否允许发出请求
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self._transition(self.HALF_OPEN, "冷却结束，放行试探请求")
+            self._probing = False
+        # 半开状态只放行一个试探请求（试探请求被取消而未回报结果时，超时后再放行）
+        now = time.monotonic()
+        if self._probing and now - self._probe_started < self.reset_timeout:
+            self.rejected += 1
+            return False
+        self._probing = True
+        self._probe_started = now
+        return True
+
+    def record_success(self):
+        """记录一次成功"""
+        self.failures = 0
+        self._probing = False
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED, "试探请求成功")
+
+    def release(self):
+        """请求结束但不计入成功或失败（如被限流、被取消），半开状态下允许再放行一个试探请求"""
+        self._probing = False
+
+    def record_failure(self):
+        """记录一次失败"""
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN:
+            self.opened_at = time.monotonic()
+            self._transition(self.OPEN, "试探请求失败")
+        elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._transition(self.OPEN, f"连续失败 {self.failures} 次")
+
+    def stats(self) -> Dict[str, object]:
+        """熔断器状态和计数"""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
@@ -1,75 +1,657 @@
 # /astrbot_plugin_class2_notify/services/class2_api.py
 
+import json
+import time
+import random
+import asyncio
+import hashlib
+import itertools
 import aiohttp
-from typing import Optional, Dict, List, Any
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, List, Any, Tuple, Callable, Awaitable, AsyncIterator
 from astrbot.core import logger
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .http_tracing import RequestTracer
+from ..models import Course, CourseStatus
+from ..utils.json_stream import JsonArrayStream
 
 
 class Class2API:
     """第二课堂API服务"""
 
     # 课程状态映射 (基于 sign_status)
-    SIGN_STATUS_MAP = {
-        0: "未上架",
-        1: "未开始",
-        2: "进行中",
-        3: "已结束",
-        4: "已下架"
+    SIGN_STATUS_MAP = {status.value: status.label for status in CourseStatus}
+
+    # 可重试的HTTP状态码（上游瞬时故障或限流）
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    # 流式解析课程列表时保留的字段（渲染、变化检测和提醒用到的字段）
+    COURSE_FIELDS = (
+        "id",
+        "title",
+        "cover_url",
+        "sign_status",
+        "score",
+        "department",
+        "time_place",
+        "sign_start_time",
+        "sign_end_time",
+        "sign_in_start_time",
+        "sign_out_end_time",
+        "course_apply_count",
+        "max",
+        "completion_flag_text",
+        "connect",
+    )
+    NESTED_COURSE_FIELDS = {
+        "transcript_index": ("transcript_name",),
+        "transcript_index_type": ("transcript_type_name",),
     }
 
+    # 流式读取响应体的分块大小
+    STREAM_CHUNK_SIZE = 64 * 1024
+
     def __init__(self, config):
         self.config = config
         self.base_url = config.api_domain.rstrip("/")
         self.token = config.api_token
         self.session: Optional[aiohttp.ClientSession] = None
+        self.tracer = RequestTracer()
+
+        # 响应缓存: key -> (写入时间, 数据)
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._refresh_tasks: Dict[Tuple, asyncio.Task] = {}
+
+        # 正在进行中的上游请求: key -> task，相同请求的并发调用者共享结果
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self.coalesced_count = 0
+
+        # 条件请求与响应摘要: key -> 校验信息 / (响应体摘要, 解析结果)
+        self._validators: Dict[Tuple, Dict[str, str]] = {}
+        self._body_digests: Dict[Tuple, Tuple[bytes, Dict[str, Any]]] = {}
+        # 课程列表每页的内容版本: key -> (版本号, 该版本的课程列表)
+        # 无论由谁请求，响应内容变化时都分配新的版本号（全局递增，不会重复）
+        self._page_versions: Dict[Tuple, Tuple[int, Any]] = {}
+        self._version_seq = itertools.count(1)
+        self._last_crawl: Optional[Dict[str, Any]] = None
+
+        # 课程模型: 课程ID -> (原始课程数据, 模型)，原始数据对象不变时复用同一个模型
+        self._models: Dict[Any, Tuple[Dict[str, Any], Course]] = {}
+
+        # 上游连续失败时熔断，查询改用缓存数据
+        self.breaker = CircuitBreaker(
+            "class2-api",
+            config.breaker_failure_threshold,
+            config.breaker_reset_timeout,
+        )
+        self.retry_count = 0
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        """获取或创建session"""
+        """
+        获取或创建session
+
+        配置中的API域名或Token变化时关闭旧session并用新凭据重建；
+        域名变化时同时清空缓存，避免混用两个上游的数据。
+        """
+        base_url = self.config.api_domain.rstrip("/")
+        token = self.config.api_token
+        if (base_url, token) != (self.base_url, self.token):
+            logger.info("API凭据已变更，重建连接")
+            if base_url != self.base_url:
+                self.invalidate_cache()
+                self._validators.clear()
+                self._body_digests.clear()
+                self._page_versions.clear()
+                self._last_crawl = None
+            self.base_url, self.token = base_url, token
+            if self.session is not None and not self.session.closed:
+                await self.session.close()
+            self.session = None
+
         if self.session is None or self.session.closed:
             headers = {
                 "Content-Type": "application/json",
             }
             if self.token:
                 headers["Authorization"] = f"Bearer {self.token}"
-            
+
+            connector = aiohttp.TCPConnector(
+                limit=self.config.http_pool_size,
+                limit_per_host=self.config.http_pool_size_per_host,
+                keepalive_timeout=self.config.http_keepalive_timeout,
+                ttl_dns_cache=self.config.http_dns_cache_ttl,
+            )
+            trace_configs = [self.tracer.trace_config()] if self.config.enable_request_tracing else None
             self.session = aiohttp.ClientSession(
                 base_url=self.base_url,
                 headers=headers,
-                timeout=aiohttp.ClientTimeout(total=30)
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    sock_connect=self.config.http_connect_timeout,
+                    sock_read=self.config.http_read_timeout,
+                ),
+                trace_configs=trace_configs,
             )
         return self.session
 
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """解析 Retry-After 响应头（秒数或HTTP日期）"""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    async def _get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        reader: Optional[Callable[[aiohttp.ClientResponse], Awaitable[Any]]] = None,
+    ) -> Tuple[int, Any, Any]:
+        """
+        发送GET请求，对连接错误、超时和 429/5xx 响应按指数退避（带抖动）重试
+
+        响应带 Retry-After 时按其等待；熔断器打开时直接失败，不请求上游。
+
+        Args:
+            path: 接口路径
+            params: 查询参数
+            headers: 额外请求头
+            reader: 200响应的读取函数（默认读取完整响应体）
+
+        Returns:
+            (状态码, 响应头, 响应体或reader的返回值)，重试耗尽时返回最后一次的响应
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+            aiohttp.ClientError / asyncio.TimeoutError: 重试耗尽后的最后一次网络错误
+        """
+        attempts = max(0, self.config.http_max_retries) + 1
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError("上游服务不可用，熔断器打开中")
+
+            retry_after = None
+            try:
+                session = await self._get_session()
+                async with session.get(path, params=params, headers=headers) as response:
+                    status = response.status
+                    if status == 200 and reader is not None:
+                        body = await reader(response)
+                    else:
+                        body = await response.read()
+                    result = (status, response.headers, body)
+                    if status not in self.RETRYABLE_STATUS:
+                        self.breaker.record_success()
+                        return result
+                    retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+                    error: Exception = RuntimeError(f"HTTP {status}")
+                    if status == 429:
+                        # 被限流不代表上游故障，但要释放半开状态的试探名额
+                        self.breaker.release()
+                    else:
+                        self.breaker.record_failure()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.breaker.record_failure()
+                result = None
+                error = e
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception:
+                # 读取或流式解析响应体出错
+                self.breaker.record_failure()
+                raise
+
+            if attempt == attempts - 1 or self.breaker.is_open:
+                break
+            if retry_after is not None:
+                delay = retry_after
+            else:
+                delay = random.uniform(0, self.config.http_retry_base_delay * 2 ** attempt)
+            delay = min(delay, self.config.http_max_backoff)
+            self.retry_count += 1
+            logger.warning(
+                f"请求 {path} 失败（{type(error).__name__}: {error}），"
+                f"{delay:.1f}s 后第 {attempt + 1} 次重试"
+            )
+            await asyncio.sleep(delay)
+
+        if result is not None:
+            return result
+        raise error
+
     async def close(self):
         """关闭session"""
+        for task in list(self._refresh_tasks.values()) + list(self._inflight.values()):
+            task.cancel()
+        self._refresh_tasks.clear()
+        self._inflight.clear()
         if self.session and not self.session.closed:
             await self.session.close()
+        if self.config.enable_request_tracing:
+            logger.info(f"API请求统计: {self.tracer.stats()}")
+        logger.info(f"熔断器 {self.breaker.name}: {self.breaker.stats()}")
+
+    async def _cached_fetch(
+        self,
+        key: Tuple,
+        fetcher: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        带TTL的缓存读取（stale-while-revalidate）
 
-    async def get_course_list(self, page: int = 1, limit: int = 200) -> Optional[Dict[str, Any]]:
+        缓存未过期时直接返回；过期但仍在容忍窗口内时返回旧数据并在后台刷新；
+        超出容忍窗口或无缓存时同步请求上游。
+
+        Args:
+            key: 缓存键
+            fetcher: 实际请求上游的协程工厂
+
+        Returns:
+            响应数据
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.config.cache_ttl:
+                return entry[1]
+            if age < self.config.cache_ttl + self.config.cache_stale_ttl:
+                self._schedule_refresh(key, fetcher)
+                return entry[1]
+            if self.breaker.is_open:
+                # 上游不可用时不等待请求失败，直接返回过期数据
+                logger.debug(f"上游熔断中，返回过期缓存: {key}")
+                return entry[1]
+
+        data = await self._refresh(key, fetcher)
+        if data is None and entry is not None:
+            logger.warning("请求上游失败，返回过期的缓存数据")
+            return entry[1]
+        return data
+
+    async def _refresh(
+        self,
+        key: Tuple,
+        fetcher: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[Dict[str, Any]]:
+        """请求上游并在成功时写入缓存"""
+        data = await self._single_flight(key, fetcher)
+        if data is not None:
+            self._cache[key] = (time.monotonic(), data)
+        return data
+
+    def _schedule_refresh(
+        self,
+        key: Tuple,
+        fetcher: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> None:
+        """在后台刷新缓存，同一个键同时只会有一个刷新任务"""
+        task = self._refresh_tasks.get(key)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self._refresh(key, fetcher))
+        self._refresh_tasks[key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+
+    async def _single_flight(
+        self,
+        key: Tuple,
+        fetcher: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        合并相同的并发请求
+
+        同一个键已有请求在进行时，直接等待该请求的结果，而不是再发一次。
+        请求运行在独立的task中，单个调用者被取消不会影响其他等待者。
+
+        Args:
+            key: 请求键 (接口路径, 参数)
+            fetcher: 实际请求上游的协程工厂
+
+        Returns:
+            响应数据
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_count += 1
+            logger.debug(f"合并并发请求: {key}，累计合并 {self.coalesced_count} 次")
+        else:
+            task = asyncio.create_task(fetcher())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _request_key(path: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+        """根据接口路径和参数生成请求键"""
+        return (path, tuple(sorted((params or {}).items())))
+
+    def invalidate_cache(self) -> None:
+        """清空响应缓存"""
+        self._cache.clear()
+
+    async def get_course_list(
+        self,
+        page: int = 1,
+        limit: int = 200,
+        use_cache: bool = True,
+    ) -> Optional[Dict[str, Any]]:
         """
         获取课程列表
         
         Args:
             page: 页码
             limit: 每页数量
+            use_cache: 是否允许使用缓存；为False时强制请求上游并刷新缓存
             
         Returns:
             课程列表响应数据
         """
+        key = self._request_key("/api/course/list", {"page": page, "limit": limit})
+        fetcher = lambda: self._fetch_course_list(page, limit)
+        if not use_cache:
+            return await self._refresh(key, fetcher)
+        return await self._cached_fetch(key, fetcher)
+
+    def page_version(self, page: int, items: Any) -> Optional[int]:
+        """
+        课程列表某一页的内容版本
+
+        Args:
+            page: 页码
+            items: 该页请求返回的课程列表
+
+        Returns:
+            版本号；该页内容已被更新的响应取代时返回None
+        """
+        key = self._request_key("/api/course/list", {"page": page, "limit": self.config.crawl_page_size})
+        entry = self._page_versions.get(key)
+        if entry is None or entry[1] is not items:
+            return None
+        return entry[0]
+
+    async def _fetch_course_list(self, page: int, limit: int) -> Optional[Dict[str, Any]]:
+        """
+        请求上游课程列表
+
+        上游提供 ETag/Last-Modified 时发送条件请求；响应体与上次完全相同时
+        直接复用上次的解析结果，跳过JSON解析。
+        """
+        params = {"page": page, "limit": limit}
+        key = self._request_key("/api/course/list", params)
         try:
-            session = await self._get_session()
-            params = {"page": page, "limit": limit}
-            
-            async with session.get("/api/course/list", params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
+            headers = {}
+            validators = self._validators.get(key, {})
+            previous = self._body_digests.get(key)
+            if previous is not None:
+                if validators.get("etag"):
+                    headers["If-None-Match"] = validators["etag"]
+                if validators.get("last_modified"):
+                    headers["If-Modified-Since"] = validators["last_modified"]
+
+            stream = self.config.stream_course_list
+            status, response_headers, body = await self._get(
+                "/api/course/list",
+                params=params,
+                headers=headers,
+                reader=self._read_course_stream if stream else None,
+            )
+            if status == 304 and previous is not None:
+                return previous[1]
+            if status == 200:
+                self._validators[key] = {
+                    "etag": response_headers.get("ETag", ""),
+                    "last_modified": response_headers.get("Last-Modified", ""),
+                }
+                if stream:
+                    digest, data = body
                 else:
-                    logger.error(f"获取课程列表失败: HTTP {response.status}")
-                    return None
+                    digest = hashlib.blake2b(body, digest_size=16).digest()
+                if previous is not None and previous[0] == digest:
+                    return previous[1]
+
+                if not stream:
+                    data = json.loads(body)
+                self._body_digests[key] = (digest, data)
+                items = (data.get("data") or {}).get("items") if isinstance(data, dict) else None
+                self._page_versions[key] = (next(self._version_seq), items)
+                return data
+            else:
+                logger.error(f"获取课程列表失败: HTTP {status}")
+                return None
+        except CircuitOpenError as e:
+            logger.debug(f"获取课程列表跳过: {e}")
+            return None
         except Exception as e:
             logger.error(f"获取课程列表异常: {e}")
             return None
 
+    @classmethod
+    def project_course(cls, course: Dict[str, Any]) -> Dict[str, Any]:
+        """只保留课程中会用到的字段"""
+        projected = {field: course[field] for field in cls.COURSE_FIELDS if field in course}
+        for field, subfields in cls.NESTED_COURSE_FIELDS.items():
+            value = course.get(field)
+            if isinstance(value, dict):
+                projected[field] = {name: value[name] for name in subfields if name in value}
+        return projected
+
+    async def _read_course_stream(self, response: aiohttp.ClientResponse) -> Tuple[bytes, Any]:
+        """
+        分块读取课程列表响应，逐个解析 data.items 中的课程并投影字段
+
+        Returns:
+            (响应体摘要, 解析结果)
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        stream = JsonArrayStream(("data", "items"))
+        items = []
+        async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+            digest.update(chunk)
+            for course in stream.feed(chunk):
+                items.append(self.project_course(course) if isinstance(course, dict) else course)
+        data = stream.close()
+        if stream.found:
+            data["data"]["items"] = items
+        return digest.digest(), data
+
+    async def _fetch_page(self, page: int, limit: int) -> Optional[Dict[str, Any]]:
+        """请求课程列表的一页（合并并发，但不写入缓存）"""
+        key = self._request_key("/api/course/list", {"page": page, "limit": limit})
+        return await self._single_flight(key, lambda: self._fetch_course_list(page, limit))
+
+    async def iter_course_pages(
+        self,
+    ) -> AsyncIterator[Tuple[int, Optional[List[Dict[str, Any]]], float, int]]:
+        """
+        分页抓取全部课程，按完成顺序逐页产出
+
+        先请求第1页读取总数，再以有限并发请求剩余页。
+
+        Yields:
+            (页码, 课程列表或None表示该页失败, 该页耗时秒数, 总课程数)
+        """
+        page_size = self.config.crawl_page_size
+        started = time.monotonic()
+        first = await self._fetch_page(1, page_size)
+        latency = time.monotonic() - started
+        if not first or not first.get("data"):
+            yield 1, None, latency, 0
+            return
+
+        first_items = first["data"].get("items", [])
+        total = first["data"].get("total") or len(first_items)
+        yield 1, first_items, latency, total
+
+        page_count = min(
+            (total + page_size - 1) // page_size,
+            self.config.crawl_max_pages,
+        )
+        if page_count <= 1:
+            return
+
+        semaphore = asyncio.Semaphore(self.config.crawl_concurrency)
+
+        async def fetch(page: int):
+            async with semaphore:
+                page_started = time.monotonic()
+                response = await self._fetch_page(page, page_size)
+                items = response["data"].get("items", []) if response and response.get("data") else None
+                return page, items, time.monotonic() - page_started
+
+        tasks = [asyncio.create_task(fetch(page)) for page in range(2, page_count + 1)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                page, items, page_latency = await next_done
+                yield page, items, page_latency, total
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _crawl_all_courses(self) -> Optional[Dict[str, Any]]:
+        """抓取并合并全部分页，部分页失败时保留其余页的结果"""
+        started = time.monotonic()
+        pages: Dict[int, List[Dict[str, Any]]] = {}
+        failed_pages: List[int] = []
+        page_versions: Dict[int, Optional[int]] = {}
+        total = 0
+
+        async for page, items, latency, total in self.iter_course_pages():
+            if items is None:
+                failed_pages.append(page)
+                logger.warning(f"课程列表第{page}页获取失败 ({latency * 1000:.0f}ms)")
+            else:
+                pages[page] = items
+                page_versions[page] = self.page_version(page, items)
+                logger.debug(f"课程列表第{page}页: {len(items)} 个课程 ({latency * 1000:.0f}ms)")
+
+        if 1 not in pages:
+            return None
+
+        # 各页内容版本与上次合并时完全一致时直接复用上次的合并结果
+        # （版本由任意一次请求推进，增量抓取拿到的修改也会使上次结果失效）
+        if (
+            not failed_pages
+            and self._last_crawl is not None
+            and None not in page_versions.values()
+            and page_versions == self._last_crawl["data"]["page_versions"]
+        ):
+            logger.debug(f"课程列表未变化 ({len(pages)} 页), 耗时 {time.monotonic() - started:.2f}s")
+            return self._last_crawl
+
+        # 翻页期间列表可能发生偏移，按ID去重
+        items = []
+        seen_ids = set()
+        for page in sorted(pages):
+            for course in pages[page]:
+                course_id = course.get("id")
+                if course_id in seen_ids:
+                    continue
+                if course_id:
+                    seen_ids.add(course_id)
+                items.append(course)
+                self.course_model(course)
+
+        failed_pages.sort()
+        if not failed_pages:
+            # 已下架的课程不再保留模型
+            for course_id in self._models.keys() - seen_ids:
+                del self._models[course_id]
+        logger.info(
+            f"抓取课程列表完成: {len(items)}/{total} 个课程, {len(pages)} 页成功, "
+            f"{len(failed_pages)} 页失败, 耗时 {time.monotonic() - started:.2f}s"
+        )
+        result = {
+            "data": {
+                "items": items,
+                "total": total,
+                "failed_pages": failed_pages,
+                "page_versions": page_versions,
+            }
+        }
+        if not failed_pages:
+            self._last_crawl = result
+        return result
+
+    async def fetch_all_courses(self, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        获取全部课程（自动翻页）
+
+        Args:
+            use_cache: 是否允许使用缓存；为False时强制请求上游并刷新缓存
+
+        Returns:
+            与课程列表接口相同结构的响应数据，data 中额外包含 failed_pages 和 page_versions（页码 -> 内容版本）
+        """
+        key = ("crawl", self.config.crawl_page_size, self.config.crawl_max_pages)
+        if not use_cache:
+            return await self._refresh(key, self._crawl_all_courses)
+        return await self._cached_fetch(key, self._crawl_all_courses)
+
+    async def fetch_new_courses(
+        self, is_known_page: Callable[[List[Dict[str, Any]]], bool]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        增量抓取：按顺序翻页，直到某一页全部为已知课程为止
+
+        Args:
+            is_known_page: 判断一页课程是否全部已知的函数
+
+        Returns:
+            与课程列表接口相同结构的响应数据，items 仅包含本次抓取到的课程
+        """
+        page_size = self.config.crawl_page_size
+        items: List[Dict[str, Any]] = []
+        total = 0
+        page_versions: Dict[int, Optional[int]] = {}
+        started = time.monotonic()
+
+        for page in range(1, self.config.crawl_max_pages + 1):
+            response = await self._fetch_page(page, page_size)
+            if not response or not response.get("data"):
+                if page == 1:
+                    return None
+                logger.warning(f"增量抓取第{page}页失败，停止翻页")
+                break
+
+            page_items = response["data"].get("items", [])
+            total = response["data"].get("total") or total
+            page_versions[page] = self.page_version(page, page_items)
+            items.extend(page_items)
+            if len(page_items) < page_size or is_known_page(page_items):
+                break
+
+        logger.debug(
+            f"增量抓取完成: {page} 页, {len(items)} 个课程, "
+            f"耗时 {time.monotonic() - started:.2f}s"
+        )
+        return {
+            "data": {
+                "items": items,
+                "total": total,
+                "incremental": True,
+                "page_versions": page_versions,
+            }
+        }
+
+    def update_cached_courses(self, courses_data: Dict[str, Any]) -> None:
+        """
+        用外部合并好的全量课程数据刷新全量缓存
+
+        Args:
+            courses_data: 课程数据（data 字段内容）
+        """
+        key = ("crawl", self.config.crawl_page_size, self.config.crawl_max_pages)
+        self._cache[key] = (time.monotonic(), {"data": courses_data})
+
     async def get_course_detail(self, course_id: str) -> Optional[Dict[str, Any]]:
         """
         获取课程详情
@@ -80,20 +662,44 @@ class Class2API:
         Returns:
             课程详情数据
         """
+        key = self._request_key(f"/api/course/info/{course_id}")
+        return await self._single_flight(key, lambda: self._fetch_course_detail(course_id))
+
+    async def _fetch_course_detail(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """请求上游课程详情"""
         try:
-            session = await self._get_session()
-            
-            async with session.get(f"/api/course/info/{course_id}") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                else:
-                    logger.error(f"获取课程详情失败 (ID: {course_id}): HTTP {response.status}")
-                    return None
+            status, _, body = await self._get(f"/api/course/info/{course_id}")
+            if status == 200:
+                return json.loads(body)
+            else:
+                logger.error(f"获取课程详情失败 (ID: {course_id}): HTTP {status}")
+                return None
+        except CircuitOpenError as e:
+            logger.debug(f"获取课程详情跳过 (ID: {course_id}): {e}")
+            return None
         except Exception as e:
             logger.error(f"获取课程详情异常 (ID: {course_id}): {e}")
             return None
 
+    def course_model(self, course: Dict[str, Any]) -> Course:
+        """
+        获取课程的模型（同一份原始数据只解析一次）
+
+        Args:
+            course: 原始课程数据
+
+        Returns:
+            课程模型
+        """
+        course_id = course.get("id")
+        entry = self._models.get(course_id)
+        if entry is not None and entry[0] is course:
+            return entry[1]
+        model = Course.from_dict(course)
+        if course_id:
+            self._models[course_id] = (course, model)
+        return model
+
     def format_course_info(self, course: Dict[str, Any], index: int = 0) -> str:
         """
         格式化课程信息为Markdown格式
@@ -105,77 +711,7 @@ class Class2API:
         Returns:
             格式化后的Markdown文本
         """
-        sign_status = course.get("sign_status", -1)
-        status_text = self.SIGN_STATUS_MAP.get(sign_status, "未知")
-        
-        # 状态emoji
-        status_emoji = {
-            2: "🟢",  # 进行中
-            1: "🟡",  # 未开始
-            0: "⚪",  # 未上架
-        }.get(sign_status, "🔴")  # 已结束/已下架
-        
-        lines = []
-        
-        # 标题行
-        if index > 0:
-            lines.append(f"## {index}. {course.get('title', '未知课程')}")
-        else:
-            lines.append(f"## {course.get('title', '未知课程')}")
-        
-        # 状态
-        if status_emoji:
-            lines.append(f"**状态**: {status_emoji} {status_text}")
-        else:
-            lines.append(f"**状态**: {status_text}")
-        
-        # 课程ID
-        if course.get("id"):
-            lines.append(f"**🆔 ID**: {course['id']}")
-        
-        # 分类
-        if course.get("transcript_index") and course["transcript_index"].get("transcript_name"):
-            lines.append(f"**📂 分类**: {course['transcript_index']['transcript_name']}")
-        
-        # 类型
-        if course.get("transcript_index_type") and course["transcript_index_type"].get("transcript_type_name"):
-            lines.append(f"**🏷️ 类型**: {course['transcript_index_type']['transcript_type_name']}")
-        
-        # 报名时间
-        if course.get("sign_start_time") and course.get("sign_end_time"):
-            lines.append(f"**📅 报名时间**: {course['sign_start_time']} ~ {course['sign_end_time']}")
-        
-        # 活动时间
-        if course.get("sign_in_start_time") and course.get("sign_out_end_time"):
-            lines.append(f"**🕐 活动时间**: {course['sign_in_start_time']} ~ {course['sign_out_end_time']}")
-        
-        # 时间地点
-        if course.get("time_place"):
-            time_place = course["time_place"].replace("\r\n", " ").replace("\n", " ")
-            lines.append(f"**⏰ 时间地点**: {time_place}")
-        
-        # 人数信息
-        if course.get("course_apply_count") is not None and course.get("max"):
-            remaining = course["max"] - course["course_apply_count"]
-            lines.append(f"**👥 人数**: {course['course_apply_count']}/{course['max']} (剩余: {remaining})")
-        
-        # 积分
-        if course.get("score"):
-            lines.append(f"**⭐ 积分**: {course['score']} 分")
-        
-        # 完成要求
-        if course.get("completion_flag_text"):
-            lines.append(f"**✅ 完成**: {course['completion_flag_text']}")
-        
-        # 主办单位
-        if course.get("department"):
-            lines.append(f"**🏢 主办**: {course['department']}")
-        
-        # 联系方式
-        if course.get("connect"):
-            lines.append(f"**📞 联系**: {course['connect']}")
-        
-        return "\n\n".join(lines)
+        return self.course_model(course).markdown(index)
 
     def filter_courses_by_status(self, courses: List[Dict[str, Any]], status_list: List[int]) -> List[Dict[str, Any]]:
         """
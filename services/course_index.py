@@ -0,0 +1,371 @@
+# /astrbot_plugin_class2_notify/services/course_index.py
+
+import math
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from astrbot.core import logger
+from .class2_api import Class2API
+from ..models import Course, CourseStatus
+
+
+class CourseQuery:
+    """
+    课程筛选条件，由 `/第二课堂` 的参数解析而来
+
+    例如 `状态=2 分类=志愿 积分>=2 页=3`；单独的数字视为页码。
+    """
+
+    # 参数名 -> 字段
+    KEYS = {
+        "状态": "status",
+        "status": "status",
+        "分类": "category",
+        "category": "category",
+        "类型": "type",
+        "type": "type",
+        "主办": "department",
+        "部门": "department",
+        "department": "department",
+        "积分": "score",
+        "score": "score",
+        "页": "page",
+        "页码": "page",
+        "page": "page",
+    }
+
+    # 比较运算符（长的在前，避免 >= 被识别为 >）
+    OPERATORS = (">=", "<=", "=", ">", "<")
+
+    # 全角符号转为半角
+    _FULLWIDTH = str.maketrans({"＝": "=", "＞": ">", "＜": "<", "，": ","})
+
+    def __init__(self):
+        # None 表示使用配置的默认状态，空元组表示不限状态
+        self.statuses: Optional[Tuple[Any, ...]] = None
+        self.category: Optional[str] = None
+        self.type: Optional[str] = None
+        self.department: Optional[str] = None
+        self.score: Optional[Tuple[str, float]] = None
+        self.page = 1
+
+    @classmethod
+    def parse(cls, tokens: Iterable[str]) -> "CourseQuery":
+        """
+        解析查询参数
+
+        Args:
+            tokens: 按空白切分的参数
+
+        Returns:
+            查询条件
+
+        Raises:
+            ValueError: 参数无法识别，异常信息可直接回复给用户
+        """
+        query = cls()
+        for token in tokens:
+            token = token.translate(cls._FULLWIDTH).strip()
+            if not token:
+                continue
+            if token.isdigit():
+                query.page = max(1, int(token))
+                continue
+
+            for op in cls.OPERATORS:
+                name, sep, value = token.partition(op)
+                if sep:
+                    break
+            else:
+                raise ValueError(f"无法识别的参数: {token}")
+
+            field = cls.KEYS.get(name.strip().lower())
+            value = value.strip()
+            if field is None:
+                raise ValueError(f"未知的筛选条件: {name}")
+            if not value:
+                raise ValueError(f"筛选条件 {name} 缺少取值")
+            if field != "score" and op != "=":
+                raise ValueError(f"筛选条件 {name} 只支持 =")
+
+            if field == "page":
+                if not value.isdigit():
+                    raise ValueError("页码必须是正整数")
+                query.page = max(1, int(value))
+            elif field == "status":
+                query.statuses = cls._parse_statuses(value)
+            elif field == "score":
+                try:
+                    query.score = (op, float(value))
+                except ValueError:
+                    raise ValueError(f"积分必须是数字: {value}") from None
+            else:
+                setattr(query, field, value)
+        return query
+
+    @staticmethod
+    def _parse_statuses(value: str) -> Tuple[Any, ...]:
+        if value.lower() in ("all", "全部"):
+            return ()
+        labels = {status.label: status.value for status in CourseStatus}
+        statuses = []
+        for part in value.split(","):
+            part = part.strip()
+            if part.isdigit():
+                statuses.append(int(part))
+            elif part in labels:
+                statuses.append(labels[part])
+            elif part:
+                raise ValueError(f"未知的课程状态: {part}")
+        return tuple(sorted(set(statuses)))
+
+    @property
+    def has_filters(self) -> bool:
+        """是否指定了页码以外的条件"""
+        return self.statuses is not None or any((self.category, self.type, self.department, self.score))
+
+    def filter_key(self, default_statuses: Sequence[Any]) -> Tuple:
+        """不含页码的规范化条件，用作结果缓存的键"""
+        statuses = self.statuses if self.statuses is not None else tuple(sorted(set(default_statuses)))
+        return (statuses, self.category, self.type, self.department, self.score)
+
+    def describe(self) -> str:
+        """条件的文字描述"""
+        parts = []
+        if self.statuses is not None:
+            if self.statuses:
+                parts.append("状态=" + ",".join(
+                    Class2API.SIGN_STATUS_MAP.get(s, str(s)) for s in self.statuses
+                ))
+            else:
+                parts.append("状态=全部")
+        if self.category:
+            parts.append(f"分类={self.category}")
+        if self.type:
+            parts.append(f"类型={self.type}")
+        if self.department:
+            parts.append(f"主办={self.department}")
+        if self.score:
+            op, value = self.score
+            parts.append(f"积分{op}{value:g}")
+        return " ".join(parts)
+
+
+class CourseIndex:
+    """
+    课程二级索引：按状态、分类、类型、主办单位和积分区间维护倒排集合
+
+    随课程快照更新增量维护（只有索引字段变化的课程才会改动倒排集合），
+    查询时对各条件的集合求交集；排序后的结果按条件缓存，翻页只是切片。
+    """
+
+    FIELDS = ("status", "category", "type", "department", "score")
+
+    # 缓存的查询结果数量
+    MAX_CACHED_RESULTS = 64
+
+    def __init__(self, api_service: Class2API):
+        self.api_service = api_service
+        # 课程ID -> 原始课程数据 / 索引项 / 在上游列表中的位置
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self._terms: Dict[Any, Tuple] = {}
+        self._order: Dict[Any, int] = {}
+        # 字段 -> 取值 -> 课程ID集合
+        self._postings: Dict[str, Dict[Any, Set[Any]]] = {field: {} for field in self.FIELDS}
+        self._results: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self._source: Optional[List[Dict[str, Any]]] = None
+        # 全部课程按 (状态, 上游顺序) 排好的ID，随版本失效
+        self._sorted_ids: Optional[List[Any]] = None
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @staticmethod
+    def _score_bucket(score: Any) -> Optional[int]:
+        try:
+            return math.floor(float(score))
+        except (TypeError, ValueError):
+            return None
+
+    def _index_terms(self, model: Course) -> Tuple:
+        return (
+            model.status,
+            model.category,
+            model.type_name,
+            model.department,
+            self._score_bucket(model.score),
+        )
+
+    def _add(self, course_id: Any, terms: Tuple):
+        self._terms[course_id] = terms
+        for field, term in zip(self.FIELDS, terms):
+            self._postings[field].setdefault(term, set()).add(course_id)
+
+    def _remove(self, course_id: Any):
+        terms = self._terms.pop(course_id, None)
+        if terms is None:
+            return
+        for field, term in zip(self.FIELDS, terms):
+            postings = self._postings[field]
+            ids = postings.get(term)
+            if ids is not None:
+                ids.discard(course_id)
+                if not ids:
+                    del postings[term]
+
+    def sync(self, courses: List[Dict[str, Any]]):
+        """
+        与最新的课程列表同步（同一个列表对象只处理一次）
+
+        Args:
+            courses: 最新全部课程
+        """
+        if courses is self._source:
+            return
+
+        docs: Dict[Any, Dict[str, Any]] = {}
+        order: Dict[Any, int] = {}
+        changed = 0
+        for position, course in enumerate(courses):
+            course_id = course.get("id")
+            if not course_id or course_id in docs:
+                continue
+            docs[course_id] = course
+            order[course_id] = position
+            if self._docs.get(course_id) is course:
+                continue
+            terms = self._index_terms(self.api_service.course_model(course))
+            if self._terms.get(course_id) != terms:
+                self._remove(course_id)
+                self._add(course_id, terms)
+            changed += 1
+
+        for course_id in self._docs.keys() - docs.keys():
+            self._remove(course_id)
+            changed += 1
+
+        if changed or order != self._order:
+            self.version += 1
+            self._results.clear()
+            self._sorted_ids = None
+        self._docs = docs
+        self._order = order
+        self._source = courses
+        logger.debug(f"课程索引已同步: {len(docs)} 个课程, {changed} 个更新")
+
+    async def on_update(
+        self,
+        courses: List[Dict[str, Any]],
+        events: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """课程列表更新回调"""
+        self.sync(courses)
+
+    def _matching(self, field: str, value: str) -> Set[Any]:
+        """取值包含 value 的所有课程（分类、类型、主办单位的取值种类很少）"""
+        postings = self._postings[field]
+        exact = postings.get(value)
+        if exact is not None:
+            return exact
+        needle = value.casefold()
+        ids: Set[Any] = set()
+        for term, term_ids in postings.items():
+            if term and needle in str(term).casefold():
+                ids |= term_ids
+        return ids
+
+    def _score_candidates(self, op: str, value: float) -> Set[Any]:
+        """按积分区间取候选集合（边界区间内的课程由调用方逐个核对）"""
+        bucket = math.floor(value)
+        ids: Set[Any] = set()
+        for term, term_ids in self._postings["score"].items():
+            if term is None:
+                continue
+            if (
+                (op == "=" and term == bucket)
+                or (op in (">=", ">") and term >= bucket)
+                or (op in ("<=", "<") and term <= bucket)
+            ):
+                ids |= term_ids
+        return ids
+
+    @staticmethod
+    def _compare(score: Any, op: str, value: float) -> bool:
+        try:
+            score = float(score)
+        except (TypeError, ValueError):
+            return False
+        if op == "=":
+            return score == value
+        if op == ">=":
+            return score >= value
+        if op == "<=":
+            return score <= value
+        if op == ">":
+            return score > value
+        return score < value
+
+    def _sort_key(self, course_id: Any) -> Tuple[int, int]:
+        status = self._terms[course_id][0]
+        return (status if isinstance(status, int) else -1, self._order[course_id])
+
+    def _global_order(self) -> List[Any]:
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self._docs, key=self._sort_key)
+        return self._sorted_ids
+
+    def query(self, query: CourseQuery, default_statuses: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        按条件查询课程，结果按状态排序（同状态内保持上游顺序）
+
+        Args:
+            query: 查询条件
+            default_statuses: 未指定状态时使用的状态列表
+
+        Returns:
+            符合条件的课程列表（缓存的结果，调用方不应修改）
+        """
+        key = query.filter_key(default_statuses)
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            return cached
+
+        statuses, category, type_name, department, score = key
+        candidates: List[Set[Any]] = []
+        if statuses:
+            status_postings = self._postings["status"]
+            candidates.append(set().union(*(status_postings.get(s, ()) for s in statuses)))
+        if category:
+            candidates.append(self._matching("category", category))
+        if type_name:
+            candidates.append(self._matching("type", type_name))
+        if department:
+            candidates.append(self._matching("department", department))
+        if score:
+            candidates.append(self._score_candidates(*score))
+
+        if candidates:
+            candidates.sort(key=len)
+            ids = candidates[0].intersection(*candidates[1:])
+        else:
+            ids = set(self._docs)
+
+        if score:
+            op, value = score
+            ids = {
+                course_id for course_id in ids
+                if self._compare(self._docs[course_id].get("score"), op, value)
+            }
+
+        if len(ids) * 8 > len(self._docs):
+            # 命中较多时按预先排好的全局顺序过滤，比逐个排序快
+            ordered = [course_id for course_id in self._global_order() if course_id in ids]
+        else:
+            ordered = sorted(ids, key=self._sort_key)
+        result = [self._docs[course_id] for course_id in ordered]
+
+        self._results[key] = result
+        if len(self._results) > self.MAX_CACHED_RESULTS:
+            self._results.popitem(last=False)
+        return result
@@ -0,0 +1,260 @@
+# /astrbot_plugin_class2_notify/services/course_journal.py
+
+import os
+import json
+import time
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from astrbot.core import logger
+from .change_detector import ChangeDetector
+from ..utils.file_utils import write_bytes_atomic, write_json_atomic
+
+
+class CourseJournal:
+    """
+    课程变化日志：只追加的JSONL分段文件，每轮每个课程最多一条增量记录
+
+    每个分段旁有一个 .idx 侧车文件（课程ID与行偏移），用于按课程回放历史而无需扫描全部日志。
+    分段超过大小上限时轮换；已关闭的分段过多时压缩进检查点文件。
+    """
+
+    SEGMENT_PREFIX = "segment-"
+    SEGMENT_SUFFIX = ".jsonl"
+    INDEX_SUFFIX = ".idx"
+
+    def __init__(self, config, journal_dir: str):
+        self.config = config
+        self.journal_dir = journal_dir
+        self.checkpoint_file = os.path.join(journal_dir, "checkpoint.jsonl")
+        self.checkpoint_index_file = os.path.join(journal_dir, "checkpoint.idx.json")
+        self._lock = threading.RLock()
+        # 课程ID -> [(分段号, 行偏移)]
+        self._index: Dict[str, List[Tuple[int, int]]] = {}
+        self._checkpoint_index: Dict[str, int] = {}
+        os.makedirs(journal_dir, exist_ok=True)
+        self._segments = self._list_segments() or [1]
+        self._load_index()
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.journal_dir, f"{self.SEGMENT_PREFIX}{segment:06d}{self.SEGMENT_SUFFIX}")
+
+    def _index_path(self, segment: int) -> str:
+        return os.path.join(self.journal_dir, f"{self.SEGMENT_PREFIX}{segment:06d}{self.INDEX_SUFFIX}")
+
+    def _list_segments(self) -> List[int]:
+        segments = []
+        for name in os.listdir(self.journal_dir):
+            if name.startswith(self.SEGMENT_PREFIX) and name.endswith(self.SEGMENT_SUFFIX):
+                number = name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]
+                if number.isdigit():
+                    segments.append(int(number))
+        return sorted(segments)
+
+    def _load_index(self):
+        """加载侧车索引；当前分段直接扫描重建，以容忍写入中途崩溃"""
+        try:
+            if os.path.exists(self.checkpoint_index_file):
+                with open(self.checkpoint_index_file, "r", encoding="utf-8") as f:
+                    self._checkpoint_index = json.load(f)
+
+            for segment in self._segments[:-1]:
+                index_path = self._index_path(segment)
+                if not os.path.exists(index_path):
+                    self._scan_segment(segment)
+                    continue
+                with open(index_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        course_id, _, offset = line.rstrip("\n").rpartition("\t")
+                        if course_id:
+                            self._index.setdefault(course_id, []).append((segment, int(offset)))
+
+            self._scan_segment(self._segments[-1])
+        except Exception as e:
+            logger.error(f"加载课程变化日志索引失败: {e}")
+
+    def _scan_segment(self, segment: int):
+        """扫描分段文件重建其索引，丢弃末尾不完整的行"""
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return
+        entries = []
+        offset = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    course_id = json.loads(line)["id"]
+                except Exception:
+                    break
+                entries.append((course_id, offset))
+                offset += len(line)
+
+        if os.path.getsize(path) > offset:
+            logger.warning(f"课程变化日志分段 {segment} 末尾不完整，已截断")
+            os.truncate(path, offset)
+
+        for course_id, line_offset in entries:
+            self._index.setdefault(course_id, []).append((segment, line_offset))
+        with open(self._index_path(segment), "w", encoding="utf-8") as f:
+            f.writelines(f"{course_id}\t{line_offset}\n" for course_id, line_offset in entries)
+
+    @staticmethod
+    def _make_records(events: List[Dict[str, Any]], timestamp: float) -> List[Dict[str, Any]]:
+        """将本轮事件按课程合并为增量记录"""
+        records: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            course_id = str(event["course_id"])
+            record = records.get(course_id)
+            if record is None:
+                record = {"id": course_id, "ts": timestamp, "types": []}
+                records[course_id] = record
+            record["types"].append(event["type"])
+
+            if event["type"] == ChangeDetector.ADDED:
+                course = event["course"]
+                record["fields"] = {field: course.get(field) for field in ChangeDetector.WATCHED_FIELDS}
+            elif "changes" in event:
+                record["changes"] = {field: list(pair) for field, pair in event["changes"].items()}
+        return list(records.values())
+
+    def append(self, events: List[Dict[str, Any]], timestamp: Optional[float] = None) -> int:
+        """
+        追加本轮的变化记录
+
+        Args:
+            events: 变化事件列表
+            timestamp: 记录时间，默认当前时间
+
+        Returns:
+            写入的记录数
+        """
+        records = self._make_records(events, timestamp or time.time())
+        if not records:
+            return 0
+
+        with self._lock:
+            segment = self._segments[-1]
+            index_lines = []
+            with open(self._segment_path(segment), "ab") as f:
+                offset = f.tell()
+                for record in records:
+                    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                    f.write(line)
+                    self._index.setdefault(record["id"], []).append((segment, offset))
+                    index_lines.append(f"{record['id']}\t{offset}\n")
+                    offset += len(line)
+                if self.config.storage_durability in ("file", "full"):
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            with open(self._index_path(segment), "a", encoding="utf-8") as f:
+                f.writelines(index_lines)
+
+            if offset >= self.config.journal_segment_kb * 1024:
+                self._rotate()
+
+        return len(records)
+
+    def _rotate(self):
+        """关闭当前分段并开启新分段，必要时触发压缩"""
+        self._segments.append(self._segments[-1] + 1)
+        logger.debug(f"课程变化日志轮换到分段 {self._segments[-1]}")
+        if len(self._segments) - 1 > self.config.journal_max_segments:
+            self.compact()
+
+    def _read_line(self, path: str, offset: int) -> Optional[Dict[str, Any]]:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            line = f.readline()
+        try:
+            return json.loads(line)
+        except Exception:
+            return None
+
+    def _read_checkpoint_entry(self, course_id: str) -> List[Dict[str, Any]]:
+        offset = self._checkpoint_index.get(course_id)
+        if offset is None or not os.path.exists(self.checkpoint_file):
+            return []
+        entry = self._read_line(self.checkpoint_file, offset)
+        if not entry or entry.get("id") != course_id:
+            logger.warning(f"检查点索引与文件不一致 (ID: {course_id})")
+            return []
+        return entry["records"]
+
+    def compact(self):
+        """将所有已关闭的分段压缩进检查点（按课程分组的一行一课程文件）"""
+        with self._lock:
+            closed = self._segments[:-1]
+            if not closed:
+                return
+
+            started = time.monotonic()
+            history: Dict[str, List[Dict[str, Any]]] = {}
+            if os.path.exists(self.checkpoint_file):
+                with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        entry = json.loads(line)
+                        history[entry["id"]] = entry["records"]
+
+            for segment in closed:
+                with open(self._segment_path(segment), "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        history.setdefault(record.pop("id"), []).append(record)
+
+            payload = bytearray()
+            checkpoint_index = {}
+            for course_id, records in history.items():
+                checkpoint_index[course_id] = len(payload)
+                payload += json.dumps(
+                    {"id": course_id, "records": records},
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                ).encode("utf-8") + b"\n"
+
+            durability = self.config.storage_durability
+            write_bytes_atomic(self.checkpoint_file, bytes(payload), durability)
+            write_json_atomic(self.checkpoint_index_file, checkpoint_index, durability)
+            self._checkpoint_index = checkpoint_index
+
+            for segment in closed:
+                for path in (self._segment_path(segment), self._index_path(segment)):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            active = self._segments[-1]
+            self._segments = [active]
+            self._index = {
+                course_id: kept
+                for course_id, entries in self._index.items()
+                if (kept := [entry for entry in entries if entry[0] == active])
+            }
+            logger.info(
+                f"课程变化日志已压缩: {len(closed)} 个分段并入检查点, "
+                f"{len(history)} 个课程, 耗时 {time.monotonic() - started:.2f}s"
+            )
+
+    def replay(self, course_id: Any) -> List[Dict[str, Any]]:
+        """
+        回放单个课程的历史记录
+
+        Args:
+            course_id: 课程ID
+
+        Returns:
+            按时间顺序排列的增量记录
+        """
+        course_id = str(course_id)
+        with self._lock:
+            records = list(self._read_checkpoint_entry(course_id))
+            for segment, offset in self._index.get(course_id, []):
+                record = self._read_line(self._segment_path(segment), offset)
+                if record is not None:
+                    record.pop("id", None)
+                    records.append(record)
+        return records
@@ -2,17 +2,37 @@
 
 import os
 import json
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import List, Dict, Any, Optional, Set, Tuple
 from astrbot.core import logger
+from .change_detector import ChangeDetector
+from .course_journal import CourseJournal
+from ..utils.file_utils import write_json_atomic
+from ..utils.json_stream import JsonArrayStream
 
 
 class CourseStorage:
     """课程数据存储服务，用于保存和对比课程数据"""
 
-    def __init__(self):
+    # 读取快照文件时每次读取的字节数
+    READ_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, config):
+        self.config = config
         self.storage_dir = os.path.join("data", "astrbot_plugin_class2_notify")
         self.storage_file = os.path.join(self.storage_dir, "courses.json")
+        self.meta_file = os.path.join(self.storage_dir, "meta.json")
         self._ensure_storage_dir()
+        self.meta = self._load_meta()
+        self.journal = CourseJournal(config, os.path.join(self.storage_dir, "journal"))
+
+        # 内存中的权威快照，磁盘只用于重启恢复和延迟写入
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._courses_by_id: Dict[Any, Dict[str, Any]] = {}
+        self._fingerprints: Dict[Any, bytes] = {}
+        self._pending_fingerprints = None
+        self._persist_task: Optional[asyncio.Task] = None
+        self._persist_pending = False
 
     def _ensure_storage_dir(self):
         """确保存储目录存在"""
@@ -20,9 +40,112 @@ class CourseStorage:
             os.makedirs(self.storage_dir, exist_ok=True)
             logger.info(f"创建存储目录: {self.storage_dir}")
 
+    def _load_meta(self) -> Dict[str, Any]:
+        """加载元数据（水位线等）"""
+        if not os.path.exists(self.meta_file):
+            return {}
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"加载元数据失败: {e}")
+            return {}
+
+    def _save_meta(self) -> bool:
+        """保存元数据"""
+        try:
+            write_json_atomic(self.meta_file, self.meta, self.config.storage_durability)
+            return True
+        except Exception as e:
+            logger.error(f"保存元数据失败: {e}")
+            return False
+
+    @staticmethod
+    def ordering_key(course_id: Any) -> Tuple[int, Any]:
+        """课程ID的排序键：数字ID按数值比较，其余按字符串比较"""
+        text = str(course_id)
+        if text.isdigit():
+            return (0, int(text))
+        return (1, text)
+
+    def get_watermark(self) -> Optional[Any]:
+        """获取水位线（已知的最大课程ID）"""
+        return self.meta.get("watermark")
+
+    def update_watermark(self, courses: List[Dict[str, Any]]) -> None:
+        """
+        根据课程列表推进水位线（只更新内存，随快照一起写入磁盘）
+
+        Args:
+            courses: 课程列表
+        """
+        ids = [course.get("id") for course in courses if course.get("id")]
+        if not ids:
+            return
+        watermark = self.get_watermark()
+        candidate = max(ids, key=self.ordering_key)
+        if watermark is None or self.ordering_key(candidate) > self.ordering_key(watermark):
+            self.meta["watermark"] = candidate
+            logger.debug(f"水位线推进到: {candidate}")
+
+    def is_known_page(self, courses: List[Dict[str, Any]], known_ids: Set[Any]) -> bool:
+        """
+        判断一页课程是否全部为已知课程
+
+        Args:
+            courses: 一页课程
+            known_ids: 已知课程ID集合
+
+        Returns:
+            该页是否不含任何新课程
+        """
+        watermark = self.get_watermark()
+        for course in courses:
+            course_id = course.get("id")
+            if course_id not in known_ids:
+                return False
+            if watermark is not None and self.ordering_key(course_id) > self.ordering_key(watermark):
+                return False
+        return True
+
+    def _set_snapshot(self, courses_data: Dict[str, Any]) -> None:
+        """更新内存快照及ID索引"""
+        items = courses_data.get("items", [])
+        self._snapshot = courses_data
+        self._courses_by_id = {
+            course.get("id"): course
+            for course in items
+            if course.get("id")
+        }
+        # 刚做过变化检测的列表直接复用其指纹，避免重复计算
+        pending = self._pending_fingerprints
+        self._pending_fingerprints = None
+        if pending is not None and pending[0] is items:
+            self._fingerprints = pending[1]
+        else:
+            self._fingerprints = {
+                course_id: ChangeDetector.fingerprint(course)
+                for course_id, course in self._courses_by_id.items()
+            }
+        self.update_watermark(items)
+
+    @property
+    def course_ids(self):
+        """当前快照中的课程ID集合（只读视图）"""
+        return self._courses_by_id.keys()
+
+    @property
+    def courses(self):
+        """当前快照中的课程（只读视图）"""
+        return self._courses_by_id.values()
+
+    def get_course(self, course_id: Any) -> Optional[Dict[str, Any]]:
+        """按ID获取当前快照中的课程"""
+        return self._courses_by_id.get(course_id)
+
     def save_courses(self, courses_data: Dict[str, Any]) -> bool:
         """
-        保存课程数据
+        保存课程数据（更新内存快照并同步写入磁盘）
         
         Args:
             courses_data: 课程数据（完整的API响应）
@@ -30,10 +153,15 @@ class CourseStorage:
         Returns:
             是否保存成功
         """
+        self._set_snapshot(courses_data)
+        return self._persist(courses_data)
+
+    def _persist(self, courses_data: Dict[str, Any]) -> bool:
+        """将课程数据写入磁盘"""
         try:
-            with open(self.storage_file, "w", encoding="utf-8") as f:
-                json.dump(courses_data, f, ensure_ascii=False, indent=2)
+            write_json_atomic(self.storage_file, courses_data, self.config.storage_durability)
             logger.debug(f"课程数据已保存到: {self.storage_file}")
+            self._save_meta()
             return True
         except Exception as e:
             logger.error(f"保存课程数据失败: {e}")
@@ -41,24 +169,147 @@ class CourseStorage:
 
     def load_courses(self) -> Optional[Dict[str, Any]]:
         """
-        加载已保存的课程数据
+        加载课程数据，优先返回内存快照，仅在启动后首次调用时读取磁盘
         
         Returns:
             课程数据，如果不存在则返回None
         """
+        if self._snapshot is None:
+            data = self._read_snapshot()
+            if data is not None:
+                self._set_snapshot(data)
+        return self._snapshot
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        """从磁盘读取课程数据"""
         if not os.path.exists(self.storage_file):
             logger.debug("课程数据文件不存在")
             return None
 
         try:
-            with open(self.storage_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            # 逐段解析课程列表，避免一次 json.load 长时间持有GIL
+            stream = JsonArrayStream(("items",))
+            items = []
+            with open(self.storage_file, "rb") as f:
+                for chunk in iter(lambda: f.read(self.READ_CHUNK_SIZE), b""):
+                    items.extend(stream.feed(chunk))
+            data = stream.close()
+            if stream.found:
+                data["items"] = items
             logger.debug(f"已加载课程数据: {len(data.get('items', []))} 个课程")
             return data
         except Exception as e:
             logger.error(f"加载课程数据失败: {e}")
             return None
 
+    async def save_courses_async(self, courses_data: Dict[str, Any]) -> bool:
+        """
+        更新内存快照，并在后台工作线程中延迟写入磁盘
+
+        连续多次保存时只写入最新的快照。
+
+        Args:
+            courses_data: 课程数据（完整的API响应）
+
+        Returns:
+            是否已接受保存
+        """
+        self._set_snapshot(courses_data)
+        self._persist_pending = True
+        if self._persist_task is None or self._persist_task.done():
+            self._persist_task = asyncio.create_task(self._persist_loop())
+        return True
+
+    async def _persist_loop(self):
+        """后台写入循环，直到没有待写入的快照"""
+        while self._persist_pending:
+            self._persist_pending = False
+            await asyncio.to_thread(self._persist, self._snapshot)
+
+    async def flush(self):
+        """等待所有延迟写入完成"""
+        if self._persist_task is not None:
+            await self._persist_task
+
+    async def load_courses_async(self) -> Optional[Dict[str, Any]]:
+        """加载课程数据，需要读取磁盘时在工作线程中进行"""
+        if self._snapshot is not None:
+            return self._snapshot
+        data, fingerprints = await asyncio.to_thread(self._read_snapshot_with_fingerprints)
+        if data is not None and self._snapshot is None:
+            self._pending_fingerprints = fingerprints
+            self._set_snapshot(data)
+        return self._snapshot
+
+    def _read_snapshot_with_fingerprints(self) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple]]:
+        """读取快照并计算课程指纹（在工作线程中调用）"""
+        data = self._read_snapshot()
+        if data is None:
+            return None, None
+        items = data.get("items", [])
+        fingerprints = {
+            course.get("id"): ChangeDetector.fingerprint(course)
+            for course in items
+            if course.get("id")
+        }
+        return data, (items, fingerprints)
+
+    def detect_changes(self, new_courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        对比内存快照检测课程变化（新增、下线、状态变化、名额空出、时间调整等）
+
+        Args:
+            new_courses: 新课程列表（完整列表）
+
+        Returns:
+            变化事件列表，首次运行时为空
+        """
+        if not self._courses_by_id:
+            logger.info("首次运行，不报告课程变化")
+            return []
+
+        events, fingerprints = ChangeDetector.diff(
+            self._courses_by_id, self._fingerprints, new_courses
+        )
+        self._pending_fingerprints = (new_courses, fingerprints)
+
+        if events:
+            counts: Dict[str, int] = {}
+            for event in events:
+                counts[event["type"]] = counts.get(event["type"], 0) + 1
+            logger.info(f"检测到课程变化: {counts}")
+        return events
+
+    async def record_changes(self, events: List[Dict[str, Any]]) -> int:
+        """
+        在工作线程中将本轮变化追加到课程变化日志
+
+        Args:
+            events: 变化事件列表
+
+        Returns:
+            写入的记录数
+        """
+        if not events:
+            return 0
+        try:
+            return await asyncio.to_thread(self.journal.append, events)
+        except Exception as e:
+            logger.error(f"写入课程变化日志失败: {e}")
+            return 0
+
+    def get_course_history(self, course_id: Any) -> List[Dict[str, Any]]:
+        """
+        获取单个课程的历史变化记录
+
+        Args:
+            course_id: 课程ID
+
+        Returns:
+            按时间顺序排列的增量记录
+        """
+        return self.journal.replay(course_id)
+
     def find_new_courses(self, old_courses: List[Dict[str, Any]], new_courses: List[Dict[str, Any]], status_filter: List[int]) -> List[Dict[str, Any]]:
         """
         找出新增的课程
@@ -86,6 +337,10 @@ class CourseStorage:
         
         return new_items
 
+    def close(self):
+        """释放存储资源"""
+        pass
+
     def clear_storage(self) -> bool:
         """
         清空存储的课程数据
@@ -93,6 +348,9 @@ class CourseStorage:
         Returns:
             是否清空成功
         """
+        self._snapshot = None
+        self._courses_by_id = {}
+        self._fingerprints = {}
         try:
             if os.path.exists(self.storage_file):
                 os.remove(self.storage_file)
@@ -0,0 +1,269 @@
+# /astrbot_plugin_class2_notify/services/cover_cache.py
+
+import io
+import os
+import time
+import base64
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+import aiohttp
+from astrbot.core import logger
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 未安装时只缓存原图
+    Image = None
+
+
+class CoverCache:
+    """封面缓存服务：预先下载并缩小课程封面，渲染时使用本地图片"""
+
+    # 卡片封面区域为 200px 高，最宽的卡片（新课程通知）为 800px
+    COVER_BOX = (800, 200)
+    JPEG_QUALITY = 85
+    NEGATIVE_SUFFIX = ".neg"
+    # 内存中保留的 data URI 数量（约等于两页课程）
+    DATA_URI_CACHE_SIZE = 32
+
+    def __init__(self, config):
+        self.config = config
+        self.cache_dir = os.path.join("data", "astrbot_plugin_class2_notify", "covers")
+        self.session: Optional[aiohttp.ClientSession] = None
+        # key -> 文件大小，按最近使用顺序排列
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        # key -> 失败时间
+        self._negative: Dict[str, float] = {}
+        self._data_uris: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._background = set()
+        self._semaphore = asyncio.Semaphore(max(1, config.cover_prefetch_concurrency))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+        # 缓存上限可能已被调低
+        self._evict()
+
+    def _load_index(self):
+        """从磁盘重建缓存索引"""
+        try:
+            files = []
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                key, ext = os.path.splitext(name)
+                if ext == self.NEGATIVE_SUFFIX:
+                    self._negative[key] = stat.st_mtime
+                else:
+                    files.append((stat.st_mtime, key, stat.st_size))
+        except Exception as e:
+            logger.error(f"加载封面缓存索引失败: {e}")
+            return
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.jpg")
+
+    def _is_negative(self, key: str) -> bool:
+        failed_at = self._negative.get(key)
+        if failed_at is None:
+            return False
+        if time.time() - failed_at < self.config.cover_negative_ttl * 60:
+            return True
+        self._negative.pop(key, None)
+        try:
+            os.remove(os.path.join(self.cache_dir, key + self.NEGATIVE_SUFFIX))
+        except OSError:
+            pass
+        return False
+
+    def resolve(self, url: str) -> str:
+        """
+        获取渲染模板中使用的封面地址
+
+        已缓存时返回本地图片（data URI 或 file://；data URI 需先经 load 读入内存，
+        否则返回原地址）；近期下载失败时返回空字符串，模板将不显示封面；
+        尚未缓存时返回原地址并在后台预取。不读取磁盘。
+
+        Args:
+            url: 原始封面地址
+
+        Returns:
+            模板中使用的封面地址
+        """
+        if not url or not self.config.enable_cover_cache:
+            return url
+
+        key = self._key(url)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            if self.config.cover_src_mode == "file":
+                return "file://" + os.path.abspath(self._path(key))
+            return self._data_uri(key) or url
+        if self._is_negative(key):
+            return ""
+
+        self.prefetch_in_background([url])
+        return url
+
+    def _data_uri(self, key: str) -> Optional[str]:
+        """内存中已编码的 data URI"""
+        data_uri = self._data_uris.get(key)
+        if data_uri is not None:
+            self._data_uris.move_to_end(key)
+        return data_uri
+
+    async def load(self, urls: Iterable[str]):
+        """
+        渲染前在工作线程中读取已缓存的封面并编码为 data URI，之后 resolve 直接使用
+
+        Args:
+            urls: 即将渲染的封面地址
+        """
+        if not self.config.enable_cover_cache or self.config.cover_src_mode == "file":
+            return
+        keys = []
+        for url in urls:
+            if not url:
+                continue
+            key = self._key(url)
+            if key in self._entries and key not in self._data_uris and key not in keys:
+                keys.append(key)
+        if not keys:
+            return
+
+        data_uris = await asyncio.to_thread(self._read_data_uris, keys)
+        for key, data_uri in data_uris.items():
+            if data_uri is None:
+                self._forget(key)
+                continue
+            self._data_uris[key] = data_uri
+        while len(self._data_uris) > self.DATA_URI_CACHE_SIZE:
+            self._data_uris.popitem(last=False)
+
+    def _read_data_uris(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        data_uris: Dict[str, Optional[str]] = {}
+        for key in keys:
+            try:
+                with open(self._path(key), "rb") as f:
+                    content = f.read()
+            except OSError:
+                data_uris[key] = None
+                continue
+            data_uris[key] = "data:image/jpeg;base64," + base64.b64encode(content).decode("ascii")
+        return data_uris
+
+    def _forget(self, key: str):
+        self._total_bytes -= self._entries.pop(key, 0)
+        self._data_uris.pop(key, None)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20))
+        return self.session
+
+    async def prefetch(self, urls: Iterable[str]):
+        """
+        并发下载尚未缓存的封面
+
+        Args:
+            urls: 封面地址列表
+        """
+        if not self.config.enable_cover_cache:
+            return
+        tasks = []
+        for url in set(urls):
+            if not url:
+                continue
+            key = self._key(url)
+            if key in self._entries or self._is_negative(key):
+                continue
+            task = self._pending.get(key)
+            if task is None:
+                task = asyncio.create_task(self._fetch(url, key))
+                self._pending[key] = task
+                task.add_done_callback(lambda _, k=key: self._pending.pop(k, None))
+            tasks.append(task)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def prefetch_in_background(self, urls: Iterable[str]):
+        """在后台预取封面，不等待结果"""
+        task = asyncio.create_task(self.prefetch(list(urls)))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _fetch(self, url: str, key: str):
+        """下载单个封面，缩小后写入缓存；失败时记录负缓存"""
+        async with self._semaphore:
+            try:
+                session = await self._get_session()
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        raise RuntimeError(f"HTTP {response.status}")
+                    content = await response.read()
+                content = await asyncio.to_thread(self._shrink, content)
+                path = self._path(key)
+                await asyncio.to_thread(self._write_file, path, content)
+            except Exception as e:
+                logger.debug(f"下载封面失败 ({url}): {e}")
+                self._negative[key] = time.time()
+                try:
+                    open(os.path.join(self.cache_dir, key + self.NEGATIVE_SUFFIX), "wb").close()
+                except OSError:
+                    pass
+                return
+
+        self._forget(key)
+        self._entries[key] = len(content)
+        self._total_bytes += len(content)
+        self._evict()
+
+    @staticmethod
+    def _write_file(path: str, content: bytes):
+        with open(path, "wb") as f:
+            f.write(content)
+
+    @classmethod
+    def _shrink(cls, content: bytes) -> bytes:
+        """按封面区域大小等比缩小图片并转为JPEG"""
+        if Image is None:
+            return content
+        with Image.open(io.BytesIO(content)) as image:
+            image = image.convert("RGB")
+            box_width, box_height = cls.COVER_BOX
+            scale = max(box_width / image.width, box_height / image.height)
+            if scale < 1:
+                image = image.resize(
+                    (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                    Image.LANCZOS,
+                )
+            output = io.BytesIO()
+            image.save(output, format="JPEG", quality=cls.JPEG_QUALITY, optimize=True)
+            return output.getvalue()
+
+    def _evict(self):
+        """按总大小淘汰最久未使用的封面"""
+        max_bytes = self.config.cover_cache_max_mb * 1024 * 1024
+        while self._entries and self._total_bytes > max_bytes:
+            key = next(iter(self._entries))
+            self._forget(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    async def close(self):
+        """关闭session并取消未完成的下载"""
+        for task in list(self._pending.values()) + list(self._background):
+            task.cancel()
+        if self.session and not self.session.closed:
+            await self.session.close()
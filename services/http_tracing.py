@@ -0,0 +1,103 @@
+# /astrbot_plugin_class2_notify/services/http_tracing.py
+
+import time
+from types import SimpleNamespace
+from typing import Any, Dict
+import aiohttp
+from astrbot.core import logger
+
+
+class RequestTracer:
+    """基于 aiohttp.TraceConfig 记录每个请求的 DNS、建连和首字节耗时，并统计连接复用情况"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.dns_lookups = 0
+        self.dns_cache_hits = 0
+        self._totals = {"dns": 0.0, "connect": 0.0, "ttfb": 0.0}
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """创建挂载到 ClientSession 的 TraceConfig"""
+        trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=self._context)
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace_config.on_connection_create_start.append(self._on_connect_start)
+        trace_config.on_connection_create_end.append(self._on_connect_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+        trace_config.on_request_end.append(self._on_request_end)
+        return trace_config
+
+    @staticmethod
+    def _context(trace_request_ctx=None):
+        return SimpleNamespace(
+            start=0.0, dns_start=0.0, dns=None, connect_start=0.0, connect=None, reused=False,
+            trace_request_ctx=trace_request_ctx,
+        )
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.start = time.perf_counter()
+
+    async def _on_dns_start(self, session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+
+    async def _on_dns_end(self, session, ctx, params):
+        ctx.dns = time.perf_counter() - ctx.dns_start
+        self.dns_lookups += 1
+
+    async def _on_dns_cache_hit(self, session, ctx, params):
+        self.dns_cache_hits += 1
+
+    async def _on_connect_start(self, session, ctx, params):
+        ctx.connect_start = time.perf_counter()
+
+    async def _on_connect_end(self, session, ctx, params):
+        ctx.connect = time.perf_counter() - ctx.connect_start
+        self.new_connections += 1
+
+    async def _on_connection_reuse(self, session, ctx, params):
+        ctx.reused = True
+        self.reused_connections += 1
+
+    async def _on_request_end(self, session, ctx, params):
+        # 收到响应头时触发，距请求开始的时间即首字节时间
+        ttfb = time.perf_counter() - ctx.start
+        self.requests += 1
+        self._totals["ttfb"] += ttfb
+        if ctx.dns is not None:
+            self._totals["dns"] += ctx.dns
+        if ctx.connect is not None:
+            # 建连耗时包含DNS解析
+            self._totals["connect"] += ctx.connect
+
+        dns = f"{ctx.dns * 1000:.0f}ms" if ctx.dns is not None else "缓存"
+        connect = "复用" if ctx.reused else (
+            f"{ctx.connect * 1000:.0f}ms" if ctx.connect is not None else "-"
+        )
+        logger.debug(
+            f"{params.method} {params.url.path} {params.response.status}: "
+            f"DNS {dns}, 建连 {connect}, 首字节 {ttfb * 1000:.0f}ms"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取请求耗时统计
+
+        Returns:
+            请求数、连接复用率、DNS缓存命中数及平均耗时
+        """
+        connections = self.new_connections + self.reused_connections
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "reuse_rate": round(self.reused_connections / connections, 3) if connections else 0.0,
+            "dns_lookups": self.dns_lookups,
+            "dns_cache_hits": self.dns_cache_hits,
+            "avg_dns_ms": round(self._totals["dns"] / self.dns_lookups * 1000, 1) if self.dns_lookups else 0.0,
+            "avg_connect_ms": round(self._totals["connect"] / self.new_connections * 1000, 1) if self.new_connections else 0.0,
+            "avg_ttfb_ms": round(self._totals["ttfb"] / self.requests * 1000, 1) if self.requests else 0.0,
+        }
@@ -0,0 +1,535 @@
+# /astrbot_plugin_class2_notify/services/native_renderer.py
+
+import io
+import os
+import time
+import base64
+import asyncio
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from astrbot.core import logger
+
+try:
+    from PIL import Image, ImageChops, ImageDraw, ImageFont
+except ImportError:  # Pillow 未安装时不可用，回退到 html_renderer
+    Image = None
+
+
+# 常见的中文字体位置，未配置 native_font_path 时依次尝试
+FONT_CANDIDATES = (
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/wqy-microhei/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "C:/Windows/Fonts/msyh.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+)
+
+# 两种卡片布局，对应 COURSE_LIST_TEMPLATE 和 NEW_COURSE_NOTIFICATION_TEMPLATE 的样式
+LAYOUTS = {
+    "list": {
+        "container": 1200,
+        "columns": 2,
+        "background": ("#667eea", "#764ba2"),
+        "title_size": 48,
+        "status_size": 16,
+        "highlight": "#667eea",
+        "people_background": ("#e3f2fd", "#f3e5f5"),
+    },
+    "notification": {
+        "container": 800,
+        "columns": 1,
+        "background": ("#f093fb", "#f5576c"),
+        "title_size": 42,
+        "status_size": 14,
+        "highlight": "#f5576c",
+        "people_background": ("#fff0e1", "#ffe5e5"),
+    },
+}
+
+STATUS_COLORS = {
+    0: "#9e9e9e",  # 未上架
+    1: "#ffc107",  # 未开始
+    2: "#4caf50",  # 进行中
+    3: "#f44336",  # 已结束
+    4: "#607d8b",  # 已下架
+}
+
+PAGE_PADDING = (20, 30)
+GRID_GAP = 25
+CARD_RADIUS = 16
+COVER_HEIGHT = 200
+CONTENT_PADDING = 20
+TITLE_SIZE = 26
+TITLE_LINE_HEIGHT = 36
+META_SIZE = 13
+INFO_SIZE = 14
+INFO_LINE_HEIGHT = 22
+INFO_LABEL_WIDTH = 80
+JPEG_QUALITY = 90
+
+
+def find_font(configured: str = "") -> Optional[str]:
+    """查找可用的中文字体文件"""
+    if configured:
+        return configured if os.path.exists(configured) else None
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# ---- 以下函数在渲染进程中执行，字体、字形宽度和封面在进程内缓存 ----
+
+@lru_cache(maxsize=32)
+def _font(path: str, size: int):
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=8192)
+def _char_width(path: str, size: int, char: str) -> float:
+    return _font(path, size).getlength(char)
+
+
+def _text_width(path: str, size: int, text: str) -> float:
+    return sum(_char_width(path, size, char) for char in text)
+
+
+@lru_cache(maxsize=8192)
+def _glyph(path: str, size: int, char: str, bold: bool):
+    """单个字形的蒙版（加粗时描边），字形只光栅化一次"""
+    font = _font(path, size)
+    ascent, descent = font.getmetrics()
+    stroke = 1 if bold else 0
+    width = int(_char_width(path, size, char)) + 1 + stroke * 2
+    mask = Image.new("L", (max(1, width), ascent + descent + stroke * 2), 0)
+    ImageDraw.Draw(mask).text(
+        (stroke, stroke), char, font=font, fill=255, anchor="la", stroke_width=stroke, stroke_fill=255
+    )
+    return mask
+
+
+@lru_cache(maxsize=1024)
+def _text_mask(path: str, size: int, text: str, bold: bool):
+    """由缓存的字形拼出整行文字的蒙版（标签、状态等重复文字直接复用）"""
+    ascent, descent = _font(path, size).getmetrics()
+    stroke = 1 if bold else 0
+    width = int(_text_width(path, size, text)) + 2 + stroke * 2
+    mask = Image.new("L", (max(1, width), ascent + descent + stroke * 2), 0)
+    x = 0.0
+    for char in text:
+        glyph = _glyph(path, size, char, bold)
+        mask.paste(glyph, (round(x), 0), glyph)
+        x += _char_width(path, size, char)
+    return mask
+
+
+def _draw_text(draw, xy: Tuple[float, float], text: str, font: str, size: int, color: str,
+               bold: bool = False, anchor: str = "lm"):
+    """
+    绘制单行文字
+
+    anchor 取 "lm"（左侧、垂直居中）或 "mt"（水平居中、顶部对齐）。
+    """
+    if not text:
+        return
+    mask = _text_mask(font, size, text, bold)
+    x, y = xy
+    if anchor == "mt":
+        x -= mask.width / 2
+    else:
+        y -= mask.height / 2
+    draw.bitmap((round(x), round(y)), mask, fill=color)
+
+
+@lru_cache(maxsize=2048)
+def _wrap(path: str, size: int, text: str, width: int, max_lines: int = 0) -> Tuple[str, ...]:
+    """按字符折行（中文无需分词），超出行数时末行以省略号截断"""
+    lines: List[str] = []
+    current = ""
+    current_width = 0.0
+    for char in text:
+        char_width = _char_width(path, size, char)
+        if current and current_width + char_width > width:
+            lines.append(current)
+            current, current_width = "", 0.0
+        current += char
+        current_width += char_width
+    if current:
+        lines.append(current)
+
+    if max_lines and len(lines) > max_lines:
+        lines = lines[:max_lines]
+        last = lines[-1]
+        ellipsis_width = _text_width(path, size, "…")
+        while last and _text_width(path, size, last) + ellipsis_width > width:
+            last = last[:-1]
+        lines[-1] = last + "…"
+    return tuple(lines)
+
+
+def _gradient(size: Tuple[int, int], colors: Tuple[str, str]):
+    """135度线性渐变（左上到右下），先在小图上合成再放大"""
+    return _gradient_tile(colors).resize(size, Image.BILINEAR)
+
+
+@lru_cache(maxsize=16)
+def _cached_gradient(size: Tuple[int, int], colors: Tuple[str, str]):
+    """固定尺寸的渐变（封面占位、人数信息条）在进程内复用"""
+    return _gradient(size, colors)
+
+
+@lru_cache(maxsize=8)
+def _gradient_tile(colors: Tuple[str, str]):
+    base = (256, 256)
+    horizontal = Image.linear_gradient("L").rotate(90)
+    vertical = Image.linear_gradient("L")
+    mask = ImageChops.add(horizontal, vertical, scale=2)
+    return Image.composite(
+        Image.new("RGB", base, colors[1]), Image.new("RGB", base, colors[0]), mask
+    )
+
+
+@lru_cache(maxsize=64)
+def _cover(url: str, size: Tuple[int, int]):
+    """读取本地封面（data URI 或 file://）并按 object-fit: cover 裁剪"""
+    if url.startswith("data:"):
+        content = base64.b64decode(url.split(",", 1)[1])
+    elif url.startswith("file://"):
+        with open(url[len("file://"):], "rb") as f:
+            content = f.read()
+    else:
+        # 远程地址不在渲染进程中下载
+        return None
+    with Image.open(io.BytesIO(content)) as image:
+        image = image.convert("RGB")
+        scale = max(size[0] / image.width, size[1] / image.height)
+        resized = image.resize(
+            (max(size[0], round(image.width * scale)), max(size[1], round(image.height * scale))),
+            Image.LANCZOS,
+        )
+    left = (resized.width - size[0]) // 2
+    top = (resized.height - size[1]) // 2
+    return resized.crop((left, top, left + size[0], top + size[1]))
+
+
+def _meta_tags(course: Dict[str, Any]) -> List[str]:
+    tags = []
+    if course.get("category"):
+        tags.append(str(course["category"]))
+    if course.get("type"):
+        tags.append(str(course["type"]))
+    if course.get("score"):
+        tags.append(f"{course['score']} 分")
+    return tags
+
+
+def _info_rows(course: Dict[str, Any]) -> List[Tuple[str, str]]:
+    rows = []
+    for label, field in (
+        ("主办单位：", "department"),
+        ("报名时间：", "sign_time"),
+        ("活动时间：", "activity_time"),
+        ("时间地点：", "time_place"),
+    ):
+        if course.get(field):
+            rows.append((label, str(course[field])))
+    return rows
+
+
+def _layout_tags(font: str, tags: List[str], width: int) -> List[List[Tuple[str, int]]]:
+    """将标签按宽度排成多行，返回每行的 (文字, 标签宽度)"""
+    rows: List[List[Tuple[str, int]]] = []
+    row: List[Tuple[str, int]] = []
+    row_width = 0
+    for tag in tags:
+        tag_width = int(_text_width(font, META_SIZE, tag)) + 24
+        if row and row_width + 12 + tag_width > width:
+            rows.append(row)
+            row, row_width = [], 0
+        row_width += (12 if row else 0) + tag_width
+        row.append((tag, tag_width))
+    if row:
+        rows.append(row)
+    return rows
+
+
+def _card_height(font: str, course: Dict[str, Any], width: int) -> int:
+    """计算卡片高度（与 _draw_card 的排版保持一致）"""
+    inner = width - CONTENT_PADDING * 2
+    height = COVER_HEIGHT + CONTENT_PADDING
+    title_lines = _wrap(font, TITLE_SIZE, str(course.get("title", "")), inner, 2)
+    height += len(title_lines) * TITLE_LINE_HEIGHT + 15
+
+    tag_rows = _layout_tags(font, _meta_tags(course), inner)
+    if tag_rows:
+        height += len(tag_rows) * 27 + (len(tag_rows) - 1) * 12 + 15
+
+    rows = _info_rows(course)
+    if rows:
+        height += 15
+        for _, value in rows:
+            lines = _wrap(font, INFO_SIZE, value, inner - INFO_LABEL_WIDTH)
+            height += len(lines) * INFO_LINE_HEIGHT + 10
+        height -= 10
+
+    if course.get("show_people_info"):
+        height += 15 + 46
+    return height + CONTENT_PADDING
+
+
+def _draw_card(
+    canvas,
+    font: str,
+    course: Dict[str, Any],
+    box: Tuple[int, int, int, int],
+    style: Dict[str, Any],
+    show_new: bool,
+):
+    left, top, right, bottom = box
+    width = right - left
+    inner = width - CONTENT_PADDING * 2
+    draw = ImageDraw.Draw(canvas)
+
+    # 阴影（15%黑色）和卡片底色
+    shadow = Image.new("L", (width + 1, bottom - top + 1), 0)
+    ImageDraw.Draw(shadow).rounded_rectangle((0, 0, width, bottom - top), CARD_RADIUS, fill=38)
+    canvas.paste((0, 0, 0), (left, top + 6), shadow)
+    draw.rounded_rectangle(box, CARD_RADIUS, fill="white")
+
+    # 封面（上方圆角）
+    cover_size = (width, COVER_HEIGHT)
+    cover = None
+    if course.get("cover_url"):
+        try:
+            cover = _cover(course["cover_url"], cover_size)
+        except Exception:
+            cover = None
+    if cover is None:
+        cover = _cached_gradient(cover_size, LAYOUTS["list"]["background"])
+    mask = Image.new("L", cover_size, 0)
+    ImageDraw.Draw(mask).rounded_rectangle(
+        (0, 0, width - 1, COVER_HEIGHT + CARD_RADIUS), CARD_RADIUS, fill=255
+    )
+    canvas.paste(cover, (left, top), mask)
+
+    # 状态徽标（右上）和新课程徽标（左上）
+    status_size = style["status_size"]
+    status_text = str(course.get("status_text", ""))
+    status_width = int(_text_width(font, status_size, status_text)) + 32
+    badge_height = status_size + 16
+    draw.rounded_rectangle(
+        (right - 15 - status_width, top + 15, right - 15, top + 15 + badge_height),
+        badge_height // 2,
+        fill=STATUS_COLORS.get(course.get("sign_status"), "#607d8b"),
+    )
+    _draw_text(
+        draw, (right - 15 - status_width + 16, top + 15 + badge_height / 2),
+        status_text, font, status_size, "white", bold=True,
+    )
+    if show_new:
+        new_width = int(_text_width(font, 14, "NEW")) + 32
+        draw.rounded_rectangle(
+            (left + 15, top + 15, left + 15 + new_width, top + 45), 15, fill="#ff5722"
+        )
+        _draw_text(draw, (left + 31, top + 30), "NEW", font, 14, "white", bold=True)
+
+    # 标题（最多两行）
+    x = left + CONTENT_PADDING
+    y = top + COVER_HEIGHT + CONTENT_PADDING
+    for line in _wrap(font, TITLE_SIZE, str(course.get("title", "")), inner, 2):
+        _draw_text(draw, (x, y + TITLE_LINE_HEIGHT / 2), line, font, TITLE_SIZE, "#333333", bold=True)
+        y += TITLE_LINE_HEIGHT
+    y += 15
+
+    # 标签
+    tag_rows = _layout_tags(font, _meta_tags(course), inner)
+    for row in tag_rows:
+        tag_x = x
+        for tag, tag_width in row:
+            draw.rounded_rectangle((tag_x, y, tag_x + tag_width, y + 27), 8, fill="#f5f5f5")
+            _draw_text(draw, (tag_x + 12, y + 13.5), tag, font, META_SIZE, "#666666")
+            tag_x += tag_width + 12
+        y += 27 + 12
+    if tag_rows:
+        y += 3
+
+    # 信息行
+    rows = _info_rows(course)
+    if rows:
+        draw.line((x, y, x + inner, y), fill="#eeeeee", width=1)
+        y += 15
+        for label, value in rows:
+            _draw_text(draw, (x, y + INFO_LINE_HEIGHT / 2), label, font, INFO_SIZE, "#666666", bold=True)
+            for line in _wrap(font, INFO_SIZE, value, inner - INFO_LABEL_WIDTH):
+                _draw_text(
+                    draw, (x + INFO_LABEL_WIDTH, y + INFO_LINE_HEIGHT / 2), line,
+                    font, INFO_SIZE, "#333333",
+                )
+                y += INFO_LINE_HEIGHT
+            y += 10
+        y -= 10
+
+    # 人数信息条
+    if course.get("show_people_info"):
+        y += 15
+        bar = _cached_gradient((inner, 46), style["people_background"])
+        bar_mask = Image.new("L", (inner, 46), 0)
+        ImageDraw.Draw(bar_mask).rounded_rectangle((0, 0, inner - 1, 45), 8, fill=255)
+        canvas.paste(bar, (x, y), bar_mask)
+        segments = (
+            (f"{course.get('apply_count', 0)}/{course.get('max_people', 0)}", style["highlight"], True),
+            (" 人 · 剩余 ", "#333333", False),
+            (str(course.get("remaining", 0)), style["highlight"], True),
+            (" 个名额", "#333333", False),
+        )
+        text_x = x + 12
+        for text, color, bold in segments:
+            _draw_text(draw, (text_x, y + 23), text, font, INFO_SIZE, color, bold=bold)
+            text_x += _text_width(font, INFO_SIZE, text)
+
+
+def _centered(draw, font: str, size: int, text: str, center_x: int, y: int, bold: bool = False):
+    _draw_text(draw, (center_x, y), text, font, size, "white", bold=bold, anchor="mt")
+
+
+def render_cards(layout: str, template_data: Dict[str, Any], font: str, output_path: str) -> str:
+    """
+    绘制课程卡片图片（在渲染进程中执行）
+
+    Args:
+        layout: 布局名称（list / notification）
+        template_data: 与 HTML 模板相同的模板数据
+        font: 字体文件路径
+        output_path: 输出图片路径
+
+    Returns:
+        输出图片路径
+    """
+    style = LAYOUTS[layout]
+    courses = template_data.get("courses", [])
+    columns = style["columns"]
+    container = style["container"]
+    pad_x, pad_y = PAGE_PADDING
+    card_width = (container - GRID_GAP * (columns - 1)) // columns
+
+    # 排版：同一行的卡片取最高的高度
+    header_height = style["title_size"] + 10 + 40 + 30
+    row_heights = []
+    for start in range(0, len(courses), columns):
+        row = courses[start:start + columns]
+        row_heights.append(max(_card_height(font, course, card_width) for course in row))
+
+    footer_lines = []
+    if layout == "list":
+        footer_lines = ["使用 /第二课堂 [页码] 查看其他页面的课程", "例如：/第二课堂 2 查看第2页"]
+    else:
+        hidden = template_data.get("total_count", 0) - template_data.get("display_count", 0)
+        if hidden > 0:
+            footer_lines.append(f"还有 {hidden} 个新课程未显示")
+        footer_lines.append("使用 /第二课堂 命令查看所有课程")
+
+    grid_height = sum(row_heights) + GRID_GAP * max(0, len(row_heights) - 1)
+    footer_height = 30 + 20 + len(footer_lines) * 26 + 20
+    width = container + pad_x * 2
+    height = pad_y + header_height + grid_height + footer_height + pad_y
+
+    canvas = _gradient((width, height), style["background"])
+    draw = ImageDraw.Draw(canvas)
+    center_x = width // 2
+
+    # 页头
+    y = pad_y
+    if layout == "list":
+        _centered(draw, font, style["title_size"], "第二课堂课程列表", center_x, y, bold=True)
+        subtitle = (
+            f"第 {template_data.get('current_page', 1)}/{template_data.get('total_pages', 1)} 页 · "
+            f"本页 {template_data.get('display_count', 0)} 个课程 · "
+            f"共 {template_data.get('total_count', 0)} 个课程"
+        )
+        _centered(draw, font, 20, subtitle, center_x, y + style["title_size"] + 14)
+    else:
+        _centered(draw, font, style["title_size"], "第二课堂新课程通知", center_x, y, bold=True)
+        badge = f"发现 {template_data.get('total_count', 0)} 个新课程"
+        badge_width = int(_text_width(font, 20, badge)) + 40
+        badge_top = y + style["title_size"] + 10
+        # 30%白色半透明徽标
+        overlay = Image.new("L", (badge_width + 1, 41), 0)
+        ImageDraw.Draw(overlay).rounded_rectangle((0, 0, badge_width, 40), 20, fill=77)
+        canvas.paste((255, 255, 255), (center_x - badge_width // 2, badge_top), overlay)
+        _centered(draw, font, 20, badge, center_x, badge_top + 9, bold=True)
+    y += header_height
+
+    # 卡片
+    for row_index, row_height in enumerate(row_heights):
+        row = courses[row_index * columns:(row_index + 1) * columns]
+        for column, course in enumerate(row):
+            left = pad_x + column * (card_width + GRID_GAP)
+            _draw_card(
+                canvas, font, course, (left, y, left + card_width, y + row_height),
+                style, show_new=(layout == "notification"),
+            )
+        y += row_height + GRID_GAP
+    y += 30 - GRID_GAP + 20
+
+    # 页脚
+    for line in footer_lines:
+        _centered(draw, font, 14, line, center_x, y)
+        y += 26
+
+    canvas.save(output_path, format="JPEG", quality=JPEG_QUALITY)
+    return output_path
+
+
+class NativeRenderer:
+    """基于 Pillow 的原生卡片渲染器，不依赖浏览器，在进程池中绘制"""
+
+    def __init__(self, config):
+        self.config = config
+        self.font_path = find_font(config.native_font_path) if Image is not None else None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if Image is None:
+            logger.info("未安装 Pillow，原生渲染不可用")
+        elif self.font_path is None:
+            logger.warning("未找到可用的中文字体，原生渲染不可用（可配置 native_font_path）")
+
+    @property
+    def available(self) -> bool:
+        """原生渲染是否可用"""
+        return self.font_path is not None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=max(1, self.config.render_concurrency))
+        return self._pool
+
+    async def render(self, layout: str, template_data: Dict[str, Any], output_path: str) -> str:
+        """
+        在进程池中绘制课程卡片图片
+
+        Args:
+            layout: 布局名称（list / notification）
+            template_data: 模板数据
+            output_path: 输出图片路径
+
+        Returns:
+            输出图片路径
+        """
+        if not self.available:
+            raise RuntimeError("原生渲染不可用")
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(
+            self._get_pool(), render_cards, layout, template_data, self.font_path, output_path
+        )
+        logger.debug(f"原生渲染完成 ({layout}): {(time.perf_counter() - start) * 1000:.0f}ms")
+        return path
+
+    def close(self):
+        """关闭渲染进程池"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
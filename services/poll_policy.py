@@ -0,0 +1,96 @@
+# /astrbot_plugin_class2_notify/services/poll_policy.py
+
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+from ..utils.time_utils import parse_timestamp, format_duration
+
+
+class AdaptivePollPolicy:
+    """
+    自适应轮询策略：根据观察到的变化频率和报名开始时间决定下一次检查的间隔
+
+    - 检测到变化后立即缩短到最小间隔；
+    - 连续无变化时按倍数退避，直到最大间隔；
+    - 临近已知的报名开始时间时收紧到最小间隔，并保证在开始时刻附近醒来。
+    """
+
+    # 连续无变化时每轮间隔的放大倍数
+    BACKOFF_FACTOR = 1.5
+
+    def __init__(self, config):
+        self.config = config
+        self.interval = self._fixed_interval()
+        self.quiet_rounds = 0
+
+    def _fixed_interval(self) -> float:
+        return self.config.check_interval * 60
+
+    def _bounds(self) -> Tuple[float, float]:
+        min_interval = max(10.0, self.config.min_check_interval * 60)
+        max_interval = max(min_interval, self.config.max_check_interval * 60)
+        return min_interval, max_interval
+
+    @staticmethod
+    def _next_sign_start(courses: Iterable[Dict[str, Any]], now: float, window: float) -> Optional[float]:
+        """找出最近的报名开始时间（包括刚刚开始、仍在窗口内的）"""
+        nearest = None
+        for course in courses:
+            start = parse_timestamp(course.get("sign_start_time"))
+            if start is None or start < now - window:
+                continue
+            if nearest is None or start < nearest:
+                nearest = start
+        return nearest
+
+    def next_interval(
+        self,
+        change_count: Optional[int],
+        courses: Iterable[Dict[str, Any]],
+        now: Optional[float] = None,
+    ) -> Tuple[float, str]:
+        """
+        计算下一次检查前的等待时间
+
+        Args:
+            change_count: 本轮检测到的变化数量，检查失败时为None
+            courses: 当前快照中的课程
+            now: 当前时间戳（默认为当前时间）
+
+        Returns:
+            (等待秒数, 决策原因)
+        """
+        if not self.config.adaptive_polling:
+            return self._fixed_interval(), "固定间隔"
+
+        now = time.time() if now is None else now
+        min_interval, max_interval = self._bounds()
+
+        if change_count:
+            self.quiet_rounds = 0
+            self.interval = min_interval
+            reason = f"检测到 {change_count} 处变化"
+        elif change_count is None:
+            # 检查失败时保持当前间隔，不当作“无变化”退避
+            self.interval = min(max(self.interval, min_interval), max_interval)
+            reason = "本轮检查失败，保持间隔"
+        else:
+            self.quiet_rounds += 1
+            self.interval = min(max(self.interval * self.BACKOFF_FACTOR, min_interval), max_interval)
+            reason = f"连续 {self.quiet_rounds} 轮无变化"
+
+        # 报名开始前后收紧轮询
+        window = self.config.sign_start_window * 60
+        start = self._next_sign_start(courses, now, window)
+        if start is not None:
+            until_start = start - now
+            if abs(until_start) <= window:
+                if min_interval < self.interval:
+                    self.interval = min_interval
+                when = f"{format_duration(until_start)}后" if until_start > 0 else "刚刚"
+                reason += f"；报名{when}开始，收紧轮询"
+            elif until_start - window < self.interval:
+                # 在进入报名窗口时醒来
+                self.interval = max(min_interval, until_start - window)
+                reason += f"；距下一场报名开始还有 {format_duration(until_start)}"
+
+        return self.interval, reason
@@ -0,0 +1,40 @@
+# /astrbot_plugin_class2_notify/services/rate_limiter.py
+
+import time
+import asyncio
+from typing import Optional
+
+
+class TokenBucket:
+    """令牌桶限流器：按固定速率补充令牌，允许一定的突发量"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: 每秒补充的令牌数，小于等于0表示不限流
+            capacity: 桶容量（允许的突发量），默认与速率相同且至少为1
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """获取一个令牌，令牌不足时等待"""
+        if self.rate <= 0:
+            return
+
+        # 持锁等待，保证按先来后到的顺序发放令牌
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
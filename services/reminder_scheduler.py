@@ -0,0 +1,194 @@
+# /astrbot_plugin_class2_notify/services/reminder_scheduler.py
+
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from astrbot.core import logger
+from .change_detector import ChangeDetector
+from .course_storage import CourseStorage
+from ..utils.time_utils import parse_timestamp
+
+
+# 提醒发送回调：接收本批到期的提醒 (类型, 课程, 目标时间) 列表
+ReminderSender = Callable[[List[Tuple[str, Dict[str, Any], float]]], Awaitable[None]]
+
+
+class ReminderScheduler:
+    """
+    报名提醒调度：用最小堆保存所有课程的提醒时间，由单个后台任务睡眠到最近的到期时间
+
+    课程时间变化时只重新安排该课程（旧的堆条目通过版本号惰性作废），
+    重启后从课程存储的快照重建。
+    """
+
+    # 提醒类型
+    SIGN_OPENING = "sign_opening"
+    SIGN_CLOSING = "sign_closing"
+
+    # 同一秒内到期的提醒合并为一条消息
+    BATCH_WINDOW = 1.0
+
+    def __init__(self, config, storage_service: CourseStorage, sender: ReminderSender):
+        self.config = config
+        self.storage_service = storage_service
+        self.sender = sender
+        # (触发时间, 序号, 课程ID, 提醒类型, 版本)
+        self._heap: List[Tuple[float, int, Any, str, int]] = []
+        self._seq = itertools.count()
+        # 课程ID -> 当前有效的版本号
+        self._versions: Dict[Any, int] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending_count(self) -> int:
+        """有效的待触发提醒数量（不含已作废的堆条目）"""
+        return sum(1 for entry in self._heap if self._versions.get(entry[2]) == entry[4])
+
+    def start(self):
+        """从课程存储重建提醒并启动后台任务"""
+        if not self.config.enable_reminders or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止后台任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def rebuild(self, courses: Iterable[Dict[str, Any]]):
+        """
+        按课程列表重建全部提醒
+
+        Args:
+            courses: 课程列表
+        """
+        self._heap = []
+        self._versions = {}
+        now = time.time()
+        for course in courses:
+            self._schedule(course, now, push=False)
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+        logger.debug(f"已重建报名提醒: {len(self._heap)} 个")
+
+    async def on_update(
+        self,
+        courses: List[Dict[str, Any]],
+        events: Optional[List[Dict[str, Any]]],
+    ):
+        """
+        课程列表更新回调：首次运行时重建，之后只重新安排发生变化的课程
+
+        Args:
+            courses: 最新全部课程
+            events: 本轮变化事件（首次运行时为None）
+        """
+        if not self.config.enable_reminders:
+            return
+        if events is None:
+            self.rebuild(courses)
+            return
+
+        now = time.time()
+        for event in events:
+            if event["type"] == ChangeDetector.REMOVED:
+                self._cancel(event["course_id"])
+            elif event["type"] in (
+                ChangeDetector.ADDED,
+                ChangeDetector.TIME_CHANGED,
+                ChangeDetector.STATUS_CHANGED,
+            ):
+                self._schedule(event["course"], now)
+        self._compact()
+        self._wakeup.set()
+
+    def _cancel(self, course_id: Any):
+        """作废课程的所有提醒（堆中的条目在弹出时丢弃）"""
+        self._versions.pop(course_id, None)
+
+    def _schedule(self, course: Dict[str, Any], now: float, push: bool = True):
+        """为单个课程安排报名开始和截止提醒"""
+        course_id = course.get("id")
+        if not course_id:
+            return
+        version = self._versions.get(course_id, 0) + 1
+        self._versions[course_id] = version
+
+        if course.get("sign_status") not in self.config.sign_status_filter:
+            return
+
+        entries = []
+        sign_start = parse_timestamp(course.get("sign_start_time"))
+        if sign_start is not None:
+            entries.append((sign_start - self.config.reminder_open_lead * 60, self.SIGN_OPENING))
+        sign_end = parse_timestamp(course.get("sign_end_time"))
+        if sign_end is not None:
+            entries.append((sign_end - self.config.reminder_close_lead * 60, self.SIGN_CLOSING))
+
+        for fire_at, kind in entries:
+            if fire_at < now:
+                continue
+            entry = (fire_at, next(self._seq), course_id, kind, version)
+            if push:
+                heapq.heappush(self._heap, entry)
+            else:
+                self._heap.append(entry)
+
+    def _compact(self):
+        """作废条目过多时重建堆"""
+        if len(self._heap) > 4 * len(self._versions) + 1024:
+            self._heap = [entry for entry in self._heap if self._versions.get(entry[2]) == entry[4]]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self, now: float) -> List[Tuple[str, Dict[str, Any], float]]:
+        """弹出所有到期的有效提醒，并以当前快照中的课程数据为准"""
+        due = []
+        while self._heap and self._heap[0][0] <= now + self.BATCH_WINDOW:
+            fire_at, _, course_id, kind, version = heapq.heappop(self._heap)
+            if self._versions.get(course_id) != version:
+                continue
+            course = self.storage_service.get_course(course_id)
+            if course is None or course.get("sign_status") not in self.config.sign_status_filter:
+                continue
+            if kind == self.SIGN_CLOSING:
+                if course.get("max") and ChangeDetector.remaining_seats(course) <= 0:
+                    # 名额已满，不再提醒
+                    continue
+                target = parse_timestamp(course.get("sign_end_time"))
+                lead = self.config.reminder_close_lead
+            else:
+                target = parse_timestamp(course.get("sign_start_time"))
+                lead = self.config.reminder_open_lead
+            due.append((kind, course, target if target is not None else fire_at + lead * 60))
+        return due
+
+    async def _run(self):
+        """后台任务：睡眠到最近的提醒时间，或被新的更早提醒唤醒"""
+        await self.storage_service.load_courses_async()
+        self.rebuild(self.storage_service.courses)
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            if not self._heap or self._heap[0][0] > now:
+                timeout = self._heap[0][0] - now if self._heap else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = self._pop_due(now)
+            if not due:
+                continue
+            try:
+                await self.sender(due)
+            except Exception as e:
+                logger.error(f"发送报名提醒失败: {e}")
@@ -0,0 +1,260 @@
+# /astrbot_plugin_class2_notify/services/render_cache.py
+
+import os
+import json
+import shutil
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from astrbot.core import logger
+from astrbot.api import html_renderer
+from .render_queue import RenderQueue
+from .native_renderer import NativeRenderer
+from ..utils.templates import COURSE_LIST_TEMPLATE, NEW_COURSE_NOTIFICATION_TEMPLATE
+
+
+class RenderCache:
+    """渲染缓存服务：按模板和数据内容寻址的图片磁盘缓存（LRU淘汰）"""
+
+    # 缓存格式版本，修改键的计算方式或文件布局时递增
+    CACHE_VERSION = 1
+
+    # 支持原生渲染的模板及其布局
+    NATIVE_LAYOUTS = {
+        COURSE_LIST_TEMPLATE: "list",
+        NEW_COURSE_NOTIFICATION_TEMPLATE: "notification",
+    }
+
+    def __init__(self, config, render_queue: RenderQueue, native_renderer: NativeRenderer):
+        self.config = config
+        self.render_queue = render_queue
+        self.native_renderer = native_renderer
+        self.cache_dir = os.path.join("data", "astrbot_plugin_class2_notify", "render_cache")
+        # key -> 文件名，按最近使用顺序排列（末尾为最近使用）
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._ensure_cache_dir()
+        self._load_index()
+
+    def _ensure_cache_dir(self):
+        """确保缓存目录存在"""
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            logger.info(f"创建渲染缓存目录: {self.cache_dir}")
+
+    def _load_index(self):
+        """从磁盘重建缓存索引，按修改时间恢复LRU顺序"""
+        try:
+            files = []
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                if os.path.isfile(path):
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, name, stat.st_size))
+        except Exception as e:
+            logger.error(f"加载渲染缓存索引失败: {e}")
+            return
+
+        for _, name, size in sorted(files):
+            key = os.path.splitext(name)[0]
+            self._entries[key] = name
+            self._sizes[key] = size
+            self._total_bytes += size
+
+        if files:
+            logger.debug(f"已加载渲染缓存: {len(files)} 张图片, {self._total_bytes} 字节")
+        self._evict()
+
+    @classmethod
+    def make_key(cls, template: str, template_data: Dict[str, Any], backend: str = "html") -> str:
+        """
+        计算渲染结果的内容地址
+
+        Args:
+            template: 模板字符串（模板变化即视为新版本）
+            template_data: 模板数据
+            backend: 渲染方式，不同渲染方式的结果分别缓存
+
+        Returns:
+            缓存键
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{cls.CACHE_VERSION}\0".encode())
+        if backend != "html":
+            digest.update(f"{backend}\0".encode())
+        digest.update(hashlib.sha256(template.encode("utf-8")).digest())
+        digest.update(
+            json.dumps(
+                template_data, ensure_ascii=False, sort_keys=True, default=str
+            ).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        获取缓存的图片路径
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            图片的本地路径，未命中时返回None
+        """
+        name = self._entries.get(key)
+        if name is None:
+            self.misses += 1
+            return None
+
+        path = os.path.join(self.cache_dir, name)
+        if not os.path.exists(path):
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return path
+
+    def put(self, key: str, source_path: str, move: bool = False) -> Optional[str]:
+        """
+        将渲染好的图片存入缓存
+
+        Args:
+            key: 缓存键
+            source_path: 渲染器生成的图片路径
+            move: 是否直接移动文件（源文件为本服务生成的临时文件时使用）
+
+        Returns:
+            缓存中的图片路径，失败时返回None
+        """
+        ext = os.path.splitext(source_path)[1] or ".jpg"
+        name = f"{key}{ext}"
+        path = os.path.join(self.cache_dir, name)
+        try:
+            if move:
+                os.replace(source_path, path)
+            else:
+                shutil.copyfile(source_path, path)
+            size = os.path.getsize(path)
+        except Exception as e:
+            logger.error(f"写入渲染缓存失败: {e}")
+            return None
+
+        if key in self._entries:
+            self._remove(key, delete_file=False)
+        self._entries[key] = name
+        self._sizes[key] = size
+        self._total_bytes += size
+        self._evict(keep=key)
+        return path
+
+    def _remove(self, key: str, delete_file: bool = True):
+        """从索引中移除一项，可选地删除文件"""
+        name = self._entries.pop(key, None)
+        self._total_bytes -= self._sizes.pop(key, 0)
+        if delete_file and name:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"删除渲染缓存失败: {e}")
+
+    def _evict(self, keep: Optional[str] = None):
+        """按数量和总字节数淘汰最久未使用的图片"""
+        max_items = self.config.render_cache_max_items
+        max_bytes = self.config.render_cache_max_mb * 1024 * 1024
+        while self._entries and (
+            len(self._entries) > max_items or self._total_bytes > max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            self._remove(oldest)
+
+    async def render(
+        self,
+        template: str,
+        template_data: Dict[str, Any],
+        options: Optional[Dict[str, Any]] = None,
+        priority: int = RenderQueue.QUERY,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        渲染模板，数据未变化时直接返回缓存的图片
+
+        未命中缓存时通过渲染队列排队渲染，相同内容的并发请求只渲染一次。
+
+        Args:
+            template: 模板字符串
+            template_data: 模板数据
+            options: 渲染选项
+            priority: 渲染优先级（RenderQueue.NOTIFICATION / QUERY / WARMUP）
+            timeout: 等待期限（秒），默认按优先级取值
+
+        Returns:
+            图片的本地路径
+        """
+        backends = self._backend_order(template)
+        key = self.make_key(template, template_data, backends[0])
+        cached = self.get(key)
+        if cached:
+            logger.debug(f"渲染缓存命中: {key[:12]}")
+            return cached
+
+        async def render_with_fallback() -> str:
+            last_error: Optional[Exception] = None
+            for backend in backends:
+                backend_key = self.make_key(template, template_data, backend)
+                if backend_key != key:
+                    cached = self.get(backend_key)
+                    if cached:
+                        return cached
+                try:
+                    return await self._render_with(backend, backend_key, template, template_data, options)
+                except Exception as e:
+                    last_error = e
+                    if backend != backends[-1]:
+                        logger.warning(f"{backend} 渲染失败，尝试其他渲染方式: {e}")
+            raise last_error
+
+        return await self.render_queue.submit(key, render_with_fallback, priority, timeout)
+
+    def _backend_order(self, template: str) -> List[str]:
+        """按配置确定渲染方式的尝试顺序，首选方式失败时自动回退"""
+        if template not in self.NATIVE_LAYOUTS or not self.native_renderer.available:
+            return ["html"]
+        if self.config.render_backend == "native":
+            return ["native", "html"]
+        return ["html", "native"]
+
+    async def _render_with(
+        self,
+        backend: str,
+        key: str,
+        template: str,
+        template_data: Dict[str, Any],
+        options: Optional[Dict[str, Any]],
+    ) -> str:
+        """使用指定的渲染方式渲染并存入缓存"""
+        if backend == "native":
+            tmp_path = os.path.join(self.cache_dir, f"{key}.tmp.jpg")
+            await self.native_renderer.render(
+                self.NATIVE_LAYOUTS[template], template_data, tmp_path
+            )
+            return self.put(key, tmp_path, move=True) or tmp_path
+
+        image_path = await html_renderer.render_custom_template(
+            template,
+            template_data,
+            return_url=False,
+            options=options,
+        )
+        return self.put(key, image_path) or image_path
@@ -0,0 +1,181 @@
+# /astrbot_plugin_class2_notify/services/render_queue.py
+
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from astrbot.core import logger
+
+
+class RenderJob:
+    """一个排队中的渲染任务，相同键的请求共享同一个任务"""
+
+    __slots__ = ("key", "factory", "priority", "deadline", "enqueued_at", "future", "started")
+
+    def __init__(self, key: str, factory: Callable[[], Awaitable[Any]], priority: int, deadline: float):
+        self.key = key
+        self.factory = factory
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.started = False
+
+
+class RenderQueue:
+    """渲染调度器：限制同时进行的渲染数量，按优先级和截止时间调度渲染任务"""
+
+    # 优先级（数值越小越优先）
+    NOTIFICATION = 0
+    QUERY = 1
+    WARMUP = 2
+
+    PRIORITY_NAMES = {NOTIFICATION: "notification", QUERY: "query", WARMUP: "warmup"}
+
+    # 各优先级默认的等待期限（秒），超过期限仍未开始的任务直接放弃
+    DEFAULT_DEADLINES = {NOTIFICATION: 300.0, QUERY: 60.0, WARMUP: 600.0}
+
+    def __init__(self, config):
+        self.config = config
+        self._heap: List[tuple] = []
+        self._jobs: Dict[str, RenderJob] = {}
+        self._seq = itertools.count()
+        self._running = 0
+        self._tasks = set()
+        # 指标
+        self.deduplicated = 0
+        self.expired = 0
+        self.completed = 0
+        self.failed = 0
+        self._wait_total: Dict[int, float] = {p: 0.0 for p in self.PRIORITY_NAMES}
+        self._wait_max: Dict[int, float] = {p: 0.0 for p in self.PRIORITY_NAMES}
+        self._started: Dict[int, int] = {p: 0 for p in self.PRIORITY_NAMES}
+
+    @property
+    def depth(self) -> int:
+        """排队中（尚未开始）的任务数"""
+        return sum(1 for job in self._jobs.values() if not job.started)
+
+    async def submit(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        priority: int = QUERY,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        提交渲染任务并等待结果
+
+        相同键的任务在排队或渲染期间只执行一次，后来者直接等待同一个结果；
+        优先级更高的请求会提升已排队任务的优先级。
+
+        Args:
+            key: 任务键（模板和数据的摘要）
+            factory: 执行渲染的协程工厂
+            priority: 优先级
+            timeout: 等待期限（秒），默认按优先级取值
+
+        Returns:
+            渲染结果
+
+        Raises:
+            asyncio.TimeoutError: 任务在期限内未完成
+        """
+        if timeout is None:
+            timeout = self.DEFAULT_DEADLINES.get(priority, 60.0)
+        deadline = time.monotonic() + timeout
+
+        job = self._jobs.get(key)
+        if job is not None:
+            self.deduplicated += 1
+            job.deadline = max(job.deadline, deadline)
+            if not job.started and priority < job.priority:
+                job.priority = priority
+                heapq.heappush(self._heap, (priority, next(self._seq), job))
+        else:
+            job = RenderJob(key, factory, priority, deadline)
+            self._jobs[key] = job
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+        self._pump()
+
+        # 等待者超时不影响任务本身，其他等待者仍可拿到结果
+        return await asyncio.wait_for(asyncio.shield(job.future), timeout)
+
+    def _pump(self):
+        """在并发上限内启动排队中的任务"""
+        limit = max(1, self.config.render_concurrency)
+        while self._running < limit and self._heap:
+            priority, _, job = heapq.heappop(self._heap)
+            if job.started or job.future.done() or priority != job.priority:
+                # 已提升优先级留下的旧条目
+                continue
+
+            now = time.monotonic()
+            if now > job.deadline:
+                self.expired += 1
+                self._jobs.pop(job.key, None)
+                job.future.set_exception(asyncio.TimeoutError("渲染任务等待超时"))
+                # 没有等待者时也要取走异常，避免未处理异常警告
+                job.future.exception()
+                logger.warning(
+                    f"渲染任务过期未执行 ({self.PRIORITY_NAMES.get(priority)}), "
+                    f"等待 {now - job.enqueued_at:.1f}s"
+                )
+                continue
+
+            job.started = True
+            wait = now - job.enqueued_at
+            self._started[priority] += 1
+            self._wait_total[priority] += wait
+            self._wait_max[priority] = max(self._wait_max[priority], wait)
+            self._running += 1
+            logger.debug(
+                f"开始渲染 ({self.PRIORITY_NAMES.get(priority)}): 等待 {wait * 1000:.0f}ms, "
+                f"队列深度 {self.depth}, 进行中 {self._running}"
+            )
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: RenderJob):
+        try:
+            result = await job.factory()
+        except Exception as e:
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+                job.future.exception()
+        else:
+            self.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._running -= 1
+            self._jobs.pop(job.key, None)
+            self._pump()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取渲染队列指标
+
+        Returns:
+            队列深度、进行中数量、各优先级的平均/最大等待时间等
+        """
+        waits = {}
+        for priority, name in self.PRIORITY_NAMES.items():
+            started = self._started[priority]
+            waits[name] = {
+                "started": started,
+                "avg_wait_ms": round(self._wait_total[priority] / started * 1000) if started else 0,
+                "max_wait_ms": round(self._wait_max[priority] * 1000),
+            }
+        return {
+            "depth": self.depth,
+            "running": self._running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "deduplicated": self.deduplicated,
+            "waits": waits,
+        }
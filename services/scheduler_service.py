@@ -1,30 +1,98 @@
 # /astrbot_plugin_class2_notify/services/scheduler_service.py
 
+import os
+import time
+import base64
+import random
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Awaitable, Optional
 from astrbot.core import logger
-from astrbot.api import html_renderer
 from .class2_api import Class2API
 from .course_storage import CourseStorage
+from .change_detector import ChangeDetector
+from .rate_limiter import TokenBucket
+from .render_cache import RenderCache
+from .render_queue import RenderQueue
+from .poll_policy import AdaptivePollPolicy
+from .reminder_scheduler import ReminderScheduler
+from .cover_cache import CoverCache
 from ..utils.templates import NEW_COURSE_NOTIFICATION_TEMPLATE
+from ..utils.time_utils import format_duration
+
+
+UpdateListener = Callable[
+    [List[Dict[str, Any]], Optional[List[Dict[str, Any]]]], Awaitable[None]
+]
 
 
 class SchedulerService:
     """定时任务服务：负责管理课程监控任务"""
 
+    PLATFORM_NAME = "aiocqhttp"
+    COVER_WAIT_TIMEOUT = 10  # 发送新课程通知前等待封面下载的最长时间（秒）
+
     def __init__(
         self,
         context,
         config,
         api_service: Class2API,
         storage_service: CourseStorage,
+        render_cache: RenderCache,
+        cover_cache: CoverCache,
     ):
         self.context = context
         self.config = config
         self.api_service = api_service
         self.storage_service = storage_service
+        self.render_cache = render_cache
+        self.cover_cache = cover_cache
+        # 最近一次编码的通知图片: (本地路径, 消息中使用的图片地址)
+        self._encoded_image: Optional[tuple] = None
         self.monitor_task = None
         self.is_running = False
+        self._last_full_sync = 0.0
+        # 已对比并保存过的课程列表各页内容版本（页码 -> 版本），只由监控轮询推进，
+        # 查询缓存刷新等其他请求不会改变它
+        self._consumed_versions: Dict[int, int] = {}
+        # 轮询间隔策略，及最近一轮检测到的变化数（检查失败时为None）
+        self.poll_policy = AdaptivePollPolicy(config)
+        self._last_change_count: Optional[int] = None
+        # 消息发送限流：全局一个令牌桶，每个平台各一个令牌桶
+        self._global_bucket = TokenBucket(config.send_rate_global)
+        self._platform_buckets: Dict[str, TokenBucket] = {}
+        # 课程列表更新后的回调（如预渲染），在后台执行
+        self._update_listeners: List[UpdateListener] = []
+        self._listener_tasks = set()
+        # 报名开始/截止提醒，随课程列表更新重新安排
+        self.reminders = ReminderScheduler(config, storage_service, self._send_reminders)
+        self.add_update_listener(self.reminders.on_update)
+
+    def add_update_listener(self, listener: "UpdateListener"):
+        """
+        注册课程列表更新回调
+
+        Args:
+            listener: 协程函数，接收最新全部课程列表和本轮变化事件
+                （首次运行时事件为None，表示需要全量重建）
+        """
+        self._update_listeners.append(listener)
+
+    def _dispatch_update(
+        self,
+        courses: List[Dict[str, Any]],
+        events: Optional[List[Dict[str, Any]]],
+    ):
+        """在后台通知所有更新回调，不阻塞监控循环"""
+        for listener in self._update_listeners:
+            task = asyncio.create_task(self._run_listener(listener, courses, events))
+            self._listener_tasks.add(task)
+            task.add_done_callback(self._listener_tasks.discard)
+
+    async def _run_listener(self, listener, courses, events):
+        try:
+            await listener(courses, events)
+        except Exception as e:
+            logger.error(f"课程更新回调执行失败: {e}")
 
     def start_monitoring(self):
         """启动课程监控任务"""
@@ -41,7 +109,14 @@ class SchedulerService:
             return
 
         self.monitor_task = asyncio.create_task(self._monitor_courses())
-        logger.info(f"已启动课程监控任务，检查间隔: {self.config.check_interval} 分钟")
+        self.reminders.start()
+        if self.config.adaptive_polling:
+            logger.info(
+                f"已启动课程监控任务，自适应检查间隔: "
+                f"{self.config.min_check_interval}-{self.config.max_check_interval} 分钟"
+            )
+        else:
+            logger.info(f"已启动课程监控任务，检查间隔: {self.config.check_interval} 分钟")
 
     async def _monitor_courses(self):
         """监控课程更新的主循环"""
@@ -50,14 +125,20 @@ class SchedulerService:
         # 首次运行，加载现有数据
         logger.info("初始化课程监控...")
         await self._check_and_notify(is_first_run=True)
+        self._log_cycle_stats()
 
         while self.is_running:
             try:
-                # 等待指定的间隔时间
-                await asyncio.sleep(self.config.check_interval * 60)
+                # 按本轮结果决定下一次检查的间隔
+                interval, reason = self.poll_policy.next_interval(
+                    self._last_change_count, self.storage_service.courses
+                )
+                logger.info(f"下次检查在 {format_duration(interval)} 后（{reason}）")
+                await asyncio.sleep(interval)
 
                 # 检查更新并通知
                 await self._check_and_notify(is_first_run=False)
+                self._log_cycle_stats()
 
             except asyncio.CancelledError:
                 logger.info("课程监控任务被取消")
@@ -74,9 +155,24 @@ class SchedulerService:
         Args:
             is_first_run: 是否首次运行
         """
+        self._last_change_count = None
         try:
+            # 加载旧数据
+            old_courses = []
+            if not is_first_run:
+                old_data = await self.storage_service.load_courses_async()
+                old_courses = old_data.get("items", []) if old_data else []
+
             # 获取最新课程列表
-            response = await self.api_service.get_course_list(page=1, limit=200)
+            incremental = self._should_poll_incrementally(old_courses)
+            if incremental:
+                known_ids = self.storage_service.course_ids
+                response = await self.api_service.fetch_new_courses(
+                    lambda page: self.storage_service.is_known_page(page, known_ids)
+                )
+            else:
+                # 全量轮询总是请求上游，并顺带刷新查询缓存
+                response = await self.api_service.fetch_all_courses(use_cache=False)
 
             if not response or not response.get("data"):
                 logger.warning("获取课程列表失败或数据为空")
@@ -84,35 +180,152 @@ class SchedulerService:
 
             new_courses_data = response.get("data", {})
             new_courses = new_courses_data.get("items", [])
+            page_versions = new_courses_data.get("page_versions") or {}
+
+            # 各页内容都已在之前的轮询中对比过时跳过对比和保存
+            if not is_first_run and self._is_consumed(page_versions, incremental):
+                if not incremental:
+                    self._last_full_sync = time.monotonic()
+                logger.debug("课程列表未变化，跳过本轮对比")
+                self._last_change_count = 0
+                return
+
+            if incremental:
+                # 增量结果只包含前几页，与旧快照合并成完整列表
+                fetched_ids = {course.get("id") for course in new_courses}
+                new_courses = new_courses + [
+                    course for course in old_courses
+                    if course.get("id") not in fetched_ids
+                ]
+                new_courses_data = {
+                    "items": new_courses,
+                    "total": new_courses_data.get("total") or len(new_courses),
+                }
+                self.api_service.update_cached_courses(new_courses_data)
+            else:
+                self._last_full_sync = time.monotonic()
+
+            # 部分页获取失败时，保留旧快照中未出现的课程，避免下次被误报为新课程
+            failed_pages = new_courses_data.get("failed_pages")
+            if failed_pages:
+                if is_first_run:
+                    old_data = await self.storage_service.load_courses_async()
+                    old_courses = old_data.get("items", []) if old_data else []
+                    if not old_courses:
+                        # 没有旧快照可合并，不完整的列表不能作为基线
+                        logger.warning(f"首次运行时第 {failed_pages} 页获取失败，暂不保存基线")
+                        return
+                logger.warning(f"第 {failed_pages} 页获取失败，保留上次快照中的课程")
+                fetched_ids = {course.get("id") for course in new_courses}
+                new_courses = new_courses + [
+                    course for course in old_courses
+                    if course.get("id") not in fetched_ids
+                ]
+                new_courses_data = dict(new_courses_data, items=new_courses)
 
             if is_first_run:
                 logger.info(f"首次运行，发现 {len(new_courses)} 个课程")
                 # 首次运行，保存数据但不发送通知
-                self.storage_service.save_courses(new_courses_data)
+                await self.storage_service.save_courses_async(new_courses_data)
+                self.cover_cache.prefetch_in_background(
+                    course.get("cover_url") for course in new_courses
+                )
+                self._consume_versions(page_versions, incremental)
+                self._dispatch_update(new_courses, None)
+                self._last_change_count = 0
                 return
 
-            # 加载旧数据
-            old_data = self.storage_service.load_courses()
-            old_courses = old_data.get("items", []) if old_data else []
+            # 检测课程变化
+            events = self.storage_service.detect_changes(new_courses)
+            self._last_change_count = len(events)
+            added_courses = [
+                event["course"] for event in events
+                if event["type"] == ChangeDetector.ADDED
+                and event["course"].get("sign_status") in self.config.sign_status_filter
+            ]
 
-            # 查找新增课程
-            added_courses = self.storage_service.find_new_courses(
-                old_courses, new_courses, self.config.sign_status_filter
+            # 保存最新数据
+            await self.storage_service.save_courses_async(new_courses_data)
+            await self.storage_service.record_changes(events)
+            self._consume_versions(page_versions, incremental)
+            self._dispatch_update(new_courses, events)
+
+            # 新出现的课程预取封面
+            self.cover_cache.prefetch_in_background(
+                event["course"].get("cover_url")
+                for event in events
+                if event["type"] == ChangeDetector.ADDED
             )
 
             if added_courses:
                 logger.info(f"发现 {len(added_courses)} 个新课程")
+                # 发送通知前等待封面就绪（有超时），以便通知图片使用本地封面
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(self.cover_cache.prefetch(
+                            course.get("cover_url") for course in added_courses
+                        )),
+                        timeout=self.COVER_WAIT_TIMEOUT,
+                    )
+                except asyncio.TimeoutError:
+                    logger.debug("等待封面下载超时，使用原始封面地址")
                 # 发送通知
                 await self._send_notifications(added_courses)
             else:
                 logger.debug("无新增课程")
 
-            # 保存最新数据
-            self.storage_service.save_courses(new_courses_data)
+            await self._send_change_notifications(events)
 
         except Exception as e:
             logger.error(f"检查课程更新失败: {e}")
 
+    def _is_consumed(self, page_versions: Dict[int, Optional[int]], incremental: bool) -> bool:
+        """
+        判断抓取结果的各页内容是否都已对比过
+
+        Args:
+            page_versions: 抓取结果中各页的内容版本
+            incremental: 是否为增量抓取（只包含前几页）
+        """
+        if not page_versions or None in page_versions.values():
+            return False
+        if not incremental and page_versions.keys() != self._consumed_versions.keys():
+            return False
+        return all(self._consumed_versions.get(page) == version for page, version in page_versions.items())
+
+    def _consume_versions(self, page_versions: Dict[int, Optional[int]], incremental: bool):
+        """记录已对比并保存的各页内容版本"""
+        if not incremental:
+            self._consumed_versions.clear()
+        self._consumed_versions.update(
+            (page, version) for page, version in page_versions.items() if version is not None
+        )
+
+    def _log_cycle_stats(self):
+        """每轮检查后记录渲染队列和熔断器指标"""
+        logger.debug(f"渲染队列: {self.render_cache.render_queue.stats()}")
+        logger.debug(f"熔断器: {self.api_service.breaker.stats()}")
+
+    def _should_poll_incrementally(self, old_courses: List[Dict[str, Any]]) -> bool:
+        """
+        判断本轮是否使用增量轮询
+
+        没有旧快照或到了全量对账周期时使用全量抓取，以发现课程的修改和删除。
+
+        Args:
+            old_courses: 旧课程列表
+
+        Returns:
+            是否增量轮询
+        """
+        if not self.config.incremental_polling or not old_courses:
+            return False
+        elapsed = time.monotonic() - self._last_full_sync
+        if elapsed >= self.config.full_sync_interval * 60:
+            logger.debug("到达全量对账周期，本轮全量抓取")
+            return False
+        return True
+
     def _prepare_course_data(self, course: dict) -> dict:
         """
         准备课程数据用于模板渲染
@@ -123,52 +336,211 @@ class SchedulerService:
         Returns:
             格式化后的课程数据
         """
-        sign_status = course.get("sign_status", -1)
-
-        # 格式化报名时间
-        sign_time = None
-        if course.get("sign_start_time") and course.get("sign_end_time"):
-            sign_time = f"{course['sign_start_time']} ~ {course['sign_end_time']}"
-
-        # 格式化活动时间
-        activity_time = None
-        if course.get("sign_in_start_time") and course.get("sign_out_end_time"):
-            activity_time = (
-                f"{course['sign_in_start_time']} ~ {course['sign_out_end_time']}"
+        data = self.api_service.course_model(course).view()
+        return {**data, "cover_url": self.cover_cache.resolve(data["cover_url"])}
+
+    def _get_client(self):
+        """获取 aiocqhttp 平台的客户端，找不到时返回None"""
+        platforms = self.context.platform_manager.get_insts()
+        platform = next(
+            (p for p in platforms if p.metadata.name == self.PLATFORM_NAME),
+            None,
+        )
+
+        if platform is None:
+            logger.error("未找到 aiocqhttp 平台实例，无法发送通知")
+            return None
+
+        return platform.get_client()
+
+    async def _image_file_reference(self, image_path: str) -> str:
+        """
+        将本地图片转换为消息段中的 file 字段
+
+        base64 模式（默认）内联图片内容；file 模式使用本地文件路径，
+        要求OneBot实现能读取AstrBot主机上的文件；
+        结果对同一张图片复用，所有群和重试共用一份。
+
+        Args:
+            image_path: 本地图片路径
+
+        Returns:
+            file:// 或 base64:// 形式的图片地址
+        """
+        if self._encoded_image and self._encoded_image[0] == image_path:
+            return self._encoded_image[1]
+
+        if self.config.image_send_mode == "base64":
+            with open(image_path, "rb") as f:
+                content = await asyncio.to_thread(f.read)
+            reference = "base64://" + base64.b64encode(content).decode("ascii")
+        else:
+            reference = "file:///" + os.path.abspath(image_path).lstrip("/")
+
+        self._encoded_image = (image_path, reference)
+        return reference
+
+    def _get_platform_bucket(self, platform_name: str) -> TokenBucket:
+        bucket = self._platform_buckets.get(platform_name)
+        if bucket is None:
+            bucket = TokenBucket(self.config.send_rate_per_platform)
+            self._platform_buckets[platform_name] = bucket
+        return bucket
+
+    async def _send_group_message(
+        self,
+        client,
+        semaphore: asyncio.Semaphore,
+        group_id,
+        message,
+        description: str,
+    ) -> Optional[float]:
+        """
+        向单个群发送消息，失败时按带抖动的指数退避重试
+
+        退避等待期间不占用并发名额，不影响其他群的发送。
+
+        Returns:
+            成功时返回从开始到发送成功的耗时（秒），失败返回None
+        """
+        platform_bucket = self._get_platform_bucket(self.PLATFORM_NAME)
+        started = time.monotonic()
+        max_retries = self.config.send_max_retries
+
+        for attempt in range(max_retries + 1):
+            async with semaphore:
+                await self._global_bucket.acquire()
+                await platform_bucket.acquire()
+                try:
+                    await client.api.call_action(
+                        "send_group_msg", group_id=int(group_id), message=message
+                    )
+                    latency = time.monotonic() - started
+                    logger.info(f"已向群 {group_id} 发送{description} ({latency * 1000:.0f}ms)")
+                    return latency
+                except Exception as e:
+                    error = e
+
+            if attempt < max_retries:
+                delay = self.config.send_retry_base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"向群 {group_id} 发送{description}失败: {error}，"
+                    f"{delay:.1f}s 后第 {attempt + 1} 次重试"
+                )
+                await asyncio.sleep(delay)
+
+        logger.error(f"向群 {group_id} 发送{description}失败: {error}")
+        return None
+
+    async def _broadcast(self, client, message, description: str):
+        """
+        以有限并发向所有通知群发送同一条消息
+
+        Args:
+            client: 平台客户端
+            message: 消息内容（文本或消息段列表）
+            description: 用于日志的消息描述
+        """
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(max(1, self.config.send_concurrency))
+        latencies = await asyncio.gather(*(
+            self._send_group_message(client, semaphore, group_id, message, description)
+            for group_id in self.config.notify_groups
+        ))
+        succeeded = [latency for latency in latencies if latency is not None]
+        logger.info(
+            f"{description}发送完成: {len(succeeded)}/{len(latencies)} 个群成功, "
+            f"最慢 {max(succeeded, default=0) * 1000:.0f}ms, "
+            f"总耗时 {time.monotonic() - started:.2f}s"
+        )
+
+    def _format_change_event(self, event: Dict[str, Any]) -> Optional[str]:
+        """将课程变化事件格式化为一行文本"""
+        course = event["course"]
+        title = course.get("title", "未知课程")
+        event_type = event["type"]
+
+        if event_type == ChangeDetector.SEATS_REOPENED:
+            remaining = ChangeDetector.remaining_seats(course)
+            return f"🪑 {title} 有名额空出（剩余 {remaining} 个）"
+        if event_type == ChangeDetector.STATUS_CHANGED:
+            old_status, new_status = event["changes"]["sign_status"]
+            return (
+                f"🔄 {title} 状态: "
+                f"{self.api_service.SIGN_STATUS_MAP.get(old_status, '未知')} → "
+                f"{self.api_service.SIGN_STATUS_MAP.get(new_status, '未知')}"
             )
+        if event_type == ChangeDetector.TIME_CHANGED:
+            return f"🕐 {title} 时间有调整"
+        if event_type == ChangeDetector.REMOVED:
+            return f"❌ {title} 已下线"
+        if event_type == ChangeDetector.UPDATED:
+            return f"✏️ {title} 信息有更新"
+        return None
+
+    async def _send_change_notifications(self, events: List[Dict[str, Any]]):
+        """
+        发送课程变化通知（名额空出、状态变化等）
 
-        # 计算剩余名额
-        remaining = 0
-        show_people_info = False
-        if course.get("course_apply_count") is not None and course.get("max"):
-            remaining = course["max"] - course["course_apply_count"]
-            show_people_info = True
-
-        # 处理时间地点
-        time_place = None
-        if course.get("time_place"):
-            time_place = course["time_place"].replace("\r\n", " ").replace("\n", " ")
-
-        return {
-            "id": course.get("id", ""),
-            "title": course.get("title", "未知课程"),
-            "cover_url": course.get("cover_url", ""),
-            "sign_status": sign_status,
-            "status_text": self.api_service.SIGN_STATUS_MAP.get(sign_status, "未知"),
-            "category": course.get("transcript_index", {}).get("transcript_name", ""),
-            "type": course.get("transcript_index_type", {}).get(
-                "transcript_type_name", ""
-            ),
-            "score": course.get("score", 0),
-            "department": course.get("department", ""),
-            "sign_time": sign_time,
-            "activity_time": activity_time,
-            "time_place": time_place,
-            "apply_count": course.get("course_apply_count", 0),
-            "max_people": course.get("max", 0),
-            "remaining": remaining,
-            "show_people_info": show_people_info,
-        }
+        Args:
+            events: 本轮检测到的变化事件
+        """
+        notify_types = set(self.config.notify_change_types) - {ChangeDetector.ADDED}
+        lines = [
+            line for line in (
+                self._format_change_event(event)
+                for event in events
+                if event["type"] in notify_types
+                and event["course"].get("sign_status") in self.config.sign_status_filter
+            )
+            if line
+        ]
+        if not lines or not self.config.notify_groups:
+            return
+
+        client = self._get_client()
+        if client is None:
+            return
+
+        text_message = "🔔 第二课堂课程变动\n\n" + "\n".join(lines[:10])
+        if len(lines) > 10:
+            text_message += f"\n\n...还有 {len(lines) - 10} 条变动"
+        text_message += "\n\n使用 /第二课堂 命令查看详情"
+
+        await self._broadcast(client, text_message, f"课程变动通知 ({len(lines)} 条)")
+
+    async def _send_reminders(self, due: List[tuple]):
+        """
+        发送到期的报名提醒
+
+        Args:
+            due: (提醒类型, 课程, 报名开始/截止时间) 列表
+        """
+        if not self.config.notify_groups:
+            return
+
+        lines = []
+        for kind, course, target in due:
+            title = course.get("title", "未知课程")
+            when = time.strftime("%m-%d %H:%M", time.localtime(target))
+            if kind == ReminderScheduler.SIGN_OPENING:
+                lines.append(f"📢 {title} 将于 {when} 开始报名")
+            elif course.get("max"):
+                remaining = ChangeDetector.remaining_seats(course)
+                lines.append(f"⌛ {title} 报名将于 {when} 截止，剩余 {remaining} 个名额")
+            else:
+                lines.append(f"⌛ {title} 报名将于 {when} 截止")
+
+        client = self._get_client()
+        if client is None:
+            return
+
+        text_message = "⏰ 第二课堂报名提醒\n\n" + "\n".join(lines[:10])
+        if len(lines) > 10:
+            text_message += f"\n\n...还有 {len(lines) - 10} 条提醒"
+        text_message += "\n\n使用 /第二课堂 命令查看详情"
+
+        await self._broadcast(client, text_message, f"报名提醒 ({len(lines)} 条)")
 
     async def _send_notifications(self, new_courses: List[Dict[str, Any]]):
         """
@@ -181,21 +553,13 @@ class SchedulerService:
             logger.warning("未配置通知群组，跳过发送通知")
             return
 
-        # 获取平台实例
-        platforms = self.context.platform_manager.get_insts()
-        platform = next(
-            (p for p in platforms if p.metadata.name == "aiocqhttp"),
-            None,
-        )
-
-        if platform is None:
-            logger.error("未找到 aiocqhttp 平台实例，无法发送通知")
+        client = self._get_client()
+        if client is None:
             return
 
-        client = platform.get_client()
-
         # 准备渲染数据
         display_count = min(len(new_courses), 5)  # 最多显示5个
+        await self.cover_cache.load(course.get("cover_url") for course in new_courses[:display_count])
         courses_data = [
             self._prepare_course_data(course) for course in new_courses[:display_count]
         ]
@@ -206,53 +570,40 @@ class SchedulerService:
             "display_count": display_count,
         }
 
-        # 生成图片
+        # 生成图片：按内容缓存在本地，同一批课程重复通知时不再渲染
         try:
-            # 使用 html_renderer 渲染模板
-            message_image_url = await html_renderer.render_custom_template(
+            image_path = await self.render_cache.render(
                 NEW_COURSE_NOTIFICATION_TEMPLATE,
                 template_data,
                 options={"full_page": True},
+                priority=RenderQueue.NOTIFICATION,
             )
+            message_image_url = await self._image_file_reference(image_path)
         except Exception as e:
             logger.error(f"生成通知图片失败: {e}")
             message_image_url = None
 
         # 发送到所有配置的群组
-        for group_id in self.config.notify_groups:
-            try:
-                # 只发送图片消息
-                if message_image_url:
-                    image_payload = {
-                        "group_id": int(group_id),
-                        "message": [
-                            {
-                                "type": "image",
-                                "data": {"file": message_image_url},
-                            },
-                        ],
-                    }
-                    await client.api.call_action("send_group_msg", **image_payload)
-                    logger.info(
-                        f"已向群 {group_id} 发送新课程通知 ({len(new_courses)} 个)"
-                    )
-                else:
-                    # 图片生成失败，发送简单的文本通知
-                    text_message = f"🎉 第二课堂新课程通知\n\n发现 {len(new_courses)} 个新课程！\n\n"
-                    for idx, course in enumerate(new_courses[:3], 1):
-                        text_message += f"{idx}. {course.get('title', '未知课程')}\n"
-                    if len(new_courses) > 3:
-                        text_message += f"\n...还有 {len(new_courses) - 3} 个课程\n"
-                    text_message += "\n使用 /第二课堂 命令查看详情"
-
-                    text_payload = {
-                        "group_id": int(group_id),
-                        "message": text_message,
-                    }
-                    await client.api.call_action("send_group_msg", **text_payload)
-                    logger.warning(f"图片生成失败，已向群 {group_id} 发送文本通知")
-            except Exception as e:
-                logger.error(f"向群 {group_id} 发送通知失败: {e}")
+        if message_image_url:
+            # 只发送图片消息
+            message = [
+                {
+                    "type": "image",
+                    "data": {"file": message_image_url},
+                },
+            ]
+            await self._broadcast(client, message, f"新课程通知 ({len(new_courses)} 个)")
+        else:
+            # 图片生成失败，发送简单的文本通知
+            text_message = f"🎉 第二课堂新课程通知\n\n发现 {len(new_courses)} 个新课程！\n\n"
+            for idx, course in enumerate(new_courses[:3], 1):
+                text_message += f"{idx}. {course.get('title', '未知课程')}\n"
+            if len(new_courses) > 3:
+                text_message += f"\n...还有 {len(new_courses) - 3} 个课程\n"
+            text_message += "\n使用 /第二课堂 命令查看详情"
+
+            logger.warning("图片生成失败，改为发送文本通知")
+            await self._broadcast(client, text_message, "新课程文本通知")
 
     async def stop_monitoring(self):
         """停止课程监控任务"""
@@ -268,4 +619,8 @@ class SchedulerService:
             except asyncio.CancelledError:
                 pass
 
+        for task in list(self._listener_tasks):
+            task.cancel()
+        await self.reminders.stop()
+
         logger.info("课程监控任务已停止")
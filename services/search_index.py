@@ -0,0 +1,395 @@
+# /astrbot_plugin_class2_notify/services/search_index.py
+
+import os
+import re
+import json
+import base64
+import math
+import time
+import heapq
+import asyncio
+import unicodedata
+from array import array
+from typing import Any, Dict, List, Optional, Set, Tuple
+from astrbot.core import logger
+from .class2_api import Class2API
+from ..models import CourseStatus
+from ..utils.file_utils import write_bytes_atomic
+
+
+# 检索文档: (课程ID, 报名状态, 标题, 分类, 主办单位, 时间地点)
+SearchDoc = Tuple[Any, Any, str, str, str, str]
+
+
+def normalize_text(text: Any) -> str:
+    """全角转半角并统一大小写"""
+    return unicodedata.normalize("NFKC", str(text or "")).casefold()
+
+
+def _mask_weights(weights: Tuple[float, ...]) -> Tuple[float, ...]:
+    """每种字段掩码对应的权重之和"""
+    return tuple(
+        sum(weight for i, weight in enumerate(weights) if mask >> i & 1)
+        for mask in range(1 << len(weights))
+    )
+
+
+class SearchIndex:
+    """
+    课程全文检索：对标题、分类、主办单位和时间地点按字符二元组（bigram）建立倒排索引
+
+    中文按相邻两个字切分，英文和数字按整词切分，不依赖分词库；
+    单个汉字的查询词合并所有包含该字的二元组。
+    倒排表是紧凑的整数数组，每项为 (文档序号 << 4 | 命中字段掩码)，打分时不需要回看原文；
+    重新索引时旧文档只做标记，作废过多时再压缩重建。每轮轮询只重新索引内容变化的课程，
+    离开课程列表的课程保留在索引中并标记为已下架，以便检索历史课程；
+    索引持久化到磁盘以便重启后直接加载。
+    """
+
+    # 字段 -> 权重（字段在 SearchDoc 中的位置从2开始）
+    FIELD_WEIGHTS = (3.0, 2.0, 1.0, 1.0)
+    FIELD_BITS = 4
+    FIELD_MASK = (1 << FIELD_BITS) - 1
+    # 字段掩码 -> 权重之和
+    MASK_WEIGHTS = _mask_weights(FIELD_WEIGHTS)
+
+    # 查询词在标题中完整出现时的加权
+    PHRASE_BOOST = 1.5
+
+    # 排序时状态的先后（进行中优先）
+    STATUS_RANK = {2: 0, 1: 1, 0: 2, 3: 3, 4: 4}
+
+    # 作废文档超过此比例时压缩
+    COMPACT_RATIO = 0.25
+
+    # 两次自动保存的最小间隔（秒），退出时总会保存
+    SAVE_INTERVAL = 600
+
+    # 倒排表以本机字节序的数组字节经 base64 编码保存
+    FORMAT_VERSION = 2
+    # 序列化时每段包含的文档数
+    WRITE_CHUNK = 1000
+
+    _TOKEN_RE = re.compile(r"[0-9a-z]+|[^\W\x00-\x7f]+")
+
+    def __init__(self, config, api_service: Class2API):
+        self.config = config
+        self.api_service = api_service
+        storage_dir = os.path.join("data", "astrbot_plugin_class2_notify")
+        os.makedirs(storage_dir, exist_ok=True)
+        self.index_file = os.path.join(storage_dir, "search_index.json")
+        # 文档序号 -> 文档（已删除为None）
+        self._docs: List[Optional[SearchDoc]] = []
+        self._doc_numbers: Dict[Any, int] = {}
+        # 课程ID -> 上次索引的原始课程数据，对象不变时跳过比较
+        self._sources: Dict[Any, Dict[str, Any]] = {}
+        # 词 -> 文档序号数组
+        self._postings: Dict[str, array] = {}
+        # 汉字 -> 包含该字的检索词（单字查询用）
+        self._char_terms: Dict[str, Set[str]] = {}
+        self._dead = 0
+        self._loaded = False
+        self._dirty = False
+        self._last_save: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_numbers)
+
+    @classmethod
+    def tokenize(cls, text: str) -> Set[str]:
+        """
+        将规范化后的文本切分为检索词
+
+        Args:
+            text: 已经过 normalize_text 的文本
+
+        Returns:
+            检索词集合
+        """
+        terms = set()
+        for run in cls._TOKEN_RE.findall(text):
+            if run.isascii() or len(run) == 1:
+                terms.add(run)
+            else:
+                terms.update(run[i:i + 2] for i in range(len(run) - 1))
+        return terms
+
+    def _make_doc(self, course: Dict[str, Any]) -> SearchDoc:
+        model = self.api_service.course_model(course)
+        return (
+            model.id,
+            course.get("sign_status"),
+            model.title or "",
+            model.category or "",
+            model.department or "",
+            model.time_place or "",
+        )
+
+    def _add(self, doc: SearchDoc):
+        number = len(self._docs)
+        self._docs.append(doc)
+        self._doc_numbers[doc[0]] = number
+        masks: Dict[str, int] = {}
+        for i, field in enumerate(doc[2:]):
+            for term in self.tokenize(normalize_text(field)):
+                masks[term] = masks.get(term, 0) | 1 << i
+        for term, mask in masks.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = array("I")
+                self._index_chars(term)
+            postings.append(number << self.FIELD_BITS | mask)
+
+    def _index_chars(self, term: str):
+        if len(term) <= 2 and not term.isascii():
+            for char in term:
+                self._char_terms.setdefault(char, set()).add(term)
+
+    def _remove(self, course_id: Any) -> bool:
+        number = self._doc_numbers.pop(course_id, None)
+        if number is None:
+            return False
+        self._docs[number] = None
+        self._dead += 1
+        return True
+
+    def _upsert(self, course: Dict[str, Any]) -> bool:
+        doc = self._make_doc(course)
+        if not doc[0]:
+            return False
+        number = self._doc_numbers.get(doc[0])
+        if number is not None:
+            old = self._docs[number]
+            if old == doc:
+                return False
+            if old[2:] == doc[2:]:
+                # 检索字段未变（如只有状态变化），直接替换文档
+                self._docs[number] = doc
+                return True
+        self._remove(doc[0])
+        self._add(doc)
+        return True
+
+    def _term_postings(self, term: str) -> Optional[array]:
+        """查询词的倒排表；单个汉字没有对应的二元组，合并所有包含它的二元组"""
+        if len(term) != 1 or term.isascii():
+            return self._postings.get(term)
+        bits, field_mask = self.FIELD_BITS, self.FIELD_MASK
+        masks: Dict[int, int] = {}
+        for key in self._char_terms.get(term, ()):
+            for entry in self._postings[key]:
+                number = entry >> bits
+                masks[number] = masks.get(number, 0) | entry & field_mask
+        if not masks:
+            return None
+        return array("I", sorted(number << bits | mask for number, mask in masks.items()))
+
+    def _compact(self):
+        """丢弃已删除的文档并重新编号"""
+        docs = [doc for doc in self._docs if doc is not None]
+        self._docs = []
+        self._doc_numbers = {}
+        self._postings = {}
+        self._char_terms = {}
+        self._dead = 0
+        for doc in docs:
+            self._add(doc)
+        logger.debug(f"检索索引已压缩: {len(docs)} 个课程, {len(self._postings)} 个检索词")
+
+    def sync(self, courses: List[Dict[str, Any]]) -> int:
+        """
+        与完整的课程列表对齐，只重新索引检索字段有变化的课程
+
+        不在列表中的课程保留在索引中，状态标记为已下架。
+
+        Args:
+            courses: 全部课程
+
+        Returns:
+            更新的课程数
+        """
+        changed = 0
+        sources: Dict[Any, Dict[str, Any]] = {}
+        for course in courses:
+            course_id = course.get("id")
+            if not course_id or course_id in sources:
+                continue
+            sources[course_id] = course
+            if self._sources.get(course_id) is course and course_id in self._doc_numbers:
+                continue
+            changed += self._upsert(course)
+        delisted = int(CourseStatus.DELISTED)
+        for course_id in self._doc_numbers.keys() - sources.keys():
+            number = self._doc_numbers[course_id]
+            doc = self._docs[number]
+            if doc[1] != delisted:
+                self._docs[number] = (doc[0], delisted, *doc[2:])
+                changed += 1
+        self._sources = sources
+        return changed
+
+    async def on_update(
+        self,
+        courses: List[Dict[str, Any]],
+        events: Optional[List[Dict[str, Any]]],
+    ):
+        """
+        课程列表更新回调
+
+        不依赖变化事件：事件只覆盖监控的字段，分类、主办单位等检索字段的修改不会产生事件，
+        因此总是与完整列表对齐（未变的课程对象直接跳过）。
+
+        Args:
+            courses: 最新全部课程
+            events: 本轮变化事件（未使用）
+        """
+        await self.load()
+        async with self._lock:
+            changed = self.sync(courses)
+            if not changed:
+                return
+            if self._dead > 64 and self._dead > self.COMPACT_RATIO * len(self._docs):
+                self._compact()
+            self._dirty = True
+            logger.debug(f"检索索引已更新: {changed} 个课程, 共 {len(self)} 个")
+        if self._last_save is None or time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+            await self.save()
+
+    def search(self, text: str, limit: int = 10) -> Tuple[int, List[Tuple[float, SearchDoc]]]:
+        """
+        检索课程
+
+        所有检索词都命中的课程优先；没有这样的课程时退化为命中任一检索词，
+        按 TF-IDF 式的得分（字段加权）排序，同分时进行中的课程和较新的课程在前。
+
+        Args:
+            text: 查询文本
+            limit: 返回的结果数
+
+        Returns:
+            (结果总数, [(得分, 文档), ...])
+        """
+        query = normalize_text(text)
+        terms = self.tokenize(query)
+        postings = [
+            (term, entries) for term, entries in
+            ((term, self._term_postings(term)) for term in terms)
+            if entries
+        ]
+        if not postings:
+            return 0, []
+
+        docs = self._docs
+        bits = self.FIELD_BITS
+        postings.sort(key=lambda item: len(item[1]))
+        candidates: Set[int] = set()
+        if len(postings) == len(terms):
+            candidates = {entry >> bits for entry in postings[0][1]}
+            for _, entries in postings[1:]:
+                candidates.intersection_update([entry >> bits for entry in entries])
+                if not candidates:
+                    break
+            candidates = {number for number in candidates if docs[number] is not None}
+
+        live = max(1, len(self))
+        mask, mask_weights = self.FIELD_MASK, self.MASK_WEIGHTS
+        scores: Dict[int, float] = dict.fromkeys(candidates, 0.0)
+        for _, entries in postings:
+            idf = math.log(1 + live / len(entries))
+            for entry in entries:
+                number = entry >> bits
+                if candidates:
+                    if number in scores:
+                        scores[number] += idf * mask_weights[entry & mask]
+                elif docs[number] is not None:
+                    # 没有文档命中全部检索词时，按命中的检索词打分
+                    scores[number] = scores.get(number, 0.0) + idf * mask_weights[entry & mask]
+
+        def rank(item):
+            number, score = item
+            return (score, -self.STATUS_RANK.get(docs[number][1], 5), number)
+
+        # 先按得分取出候选，再对其中标题完整包含查询词的加权
+        phrase = "".join(query.split())
+        shortlist = heapq.nlargest(limit * 3, scores.items(), key=rank)
+        boosted = [
+            (number, score * self.PHRASE_BOOST if phrase in normalize_text(docs[number][2]) else score)
+            for number, score in shortlist
+        ]
+        boosted.sort(key=rank, reverse=True)
+        return len(scores), [(score, docs[number]) for number, score in boosted[:limit]]
+
+    async def load(self):
+        """从磁盘加载索引（只加载一次）"""
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            data = await asyncio.to_thread(self._read)
+            if data is not None:
+                self._docs = [tuple(doc) if doc is not None else None for doc in data["docs"]]
+                self._doc_numbers = {
+                    doc[0]: number for number, doc in enumerate(self._docs) if doc is not None
+                }
+                self._postings = data["postings"]
+                for term in self._postings:
+                    self._index_chars(term)
+                self._dead = len(self._docs) - len(self._doc_numbers)
+                logger.info(f"已加载检索索引: {len(self)} 个课程")
+            self._loaded = True
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.index_file):
+            return None
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"加载检索索引失败: {e}")
+            return None
+        if data.get("version") != self.FORMAT_VERSION:
+            logger.info("检索索引格式已变化，将重新建立")
+            return None
+        postings = {}
+        for term, encoded in data["postings"].items():
+            numbers = postings[term] = array("I")
+            numbers.frombytes(base64.b64decode(encoded))
+        data["postings"] = postings
+        return data
+
+    async def save(self):
+        """
+        将索引写入磁盘（没有变化时跳过）
+
+        序列化和写入都在线程中进行；期间持有锁，索引不会被修改。
+        """
+        async with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._last_save = time.monotonic()
+            try:
+                await asyncio.to_thread(self._write)
+            except Exception as e:
+                self._dirty = True
+                logger.error(f"保存检索索引失败: {e}")
+
+    def _write(self):
+        # 分段序列化：单次 json.dumps 会长时间持有GIL，阻塞事件循环
+        docs = self._docs
+        parts = [f'{{"version":{self.FORMAT_VERSION},"docs":[']
+        for start in range(0, len(docs), self.WRITE_CHUNK):
+            if start:
+                parts.append(",")
+            chunk = json.dumps(docs[start:start + self.WRITE_CHUNK], ensure_ascii=False, separators=(",", ":"))
+            parts.append(chunk[1:-1])
+        parts.append('],"postings":{')
+        parts.append(",".join(
+            f'{json.dumps(term, ensure_ascii=False)}:"{base64.b64encode(numbers.tobytes()).decode("ascii")}"'
+            for term, numbers in self._postings.items()
+        ))
+        parts.append("}}")
+        # 索引可以从课程快照重建，不需要 fsync
+        write_bytes_atomic(self.index_file, "".join(parts).encode("utf-8"), "none")
@@ -0,0 +1,282 @@
+# /astrbot_plugin_class2_notify/services/sqlite_storage.py
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from astrbot.core import logger
+from .course_storage import CourseStorage
+
+
+class SQLiteCourseStorage(CourseStorage):
+    """基于SQLite的课程存储：每个课程一行，只写入发生变化的行"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS courses (
+            id TEXT PRIMARY KEY,
+            sign_status INTEGER,
+            category TEXT,
+            type TEXT,
+            sign_start_time TEXT,
+            sign_end_time TEXT,
+            sign_in_start_time TEXT,
+            sign_out_end_time TEXT,
+            data TEXT NOT NULL,
+            active INTEGER NOT NULL DEFAULT 1,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_courses_active_status ON courses (active, sign_status);
+        CREATE INDEX IF NOT EXISTS idx_courses_category ON courses (category);
+        CREATE INDEX IF NOT EXISTS idx_courses_sign_start ON courses (sign_start_time);
+        CREATE INDEX IF NOT EXISTS idx_courses_sign_end ON courses (sign_end_time);
+        CREATE INDEX IF NOT EXISTS idx_courses_first_seen ON courses (first_seen);
+        CREATE TABLE IF NOT EXISTS snapshot_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    # 课程ID查询时每批的参数数量，低于SQLite的变量数上限
+    ID_BATCH_SIZE = 500
+
+    # storage_durability 到 SQLite synchronous 级别的映射
+    SYNCHRONOUS_LEVELS = {"none": "OFF", "file": "NORMAL", "full": "FULL"}
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.db_file = os.path.join(self.storage_dir, "courses.db")
+        # 异步接口会在工作线程中访问连接，用锁串行化
+        self._lock = threading.RLock()
+        # 数据库中在架课程的内容: ID -> (写入时的课程对象, 序列化后的data)，首次保存时从数据库加载
+        self._persisted: Optional[Dict[str, Tuple[Optional[Dict[str, Any]], str]]] = None
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        synchronous = self.SYNCHRONOUS_LEVELS.get(config.storage_durability, "NORMAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.executescript(self.SCHEMA)
+        self._migrate_from_json()
+
+    def _migrate_from_json(self):
+        """首次使用时，从 courses.json 一次性导入旧数据"""
+        if self._get_meta_value("migrated_from_json") or not os.path.exists(self.storage_file):
+            return
+
+        data = CourseStorage._read_snapshot(self)
+        if data:
+            self.save_courses(data)
+            logger.info(f"已从 {self.storage_file} 迁移 {len(data.get('items', []))} 个课程到SQLite")
+        self._set_meta_value("migrated_from_json", True)
+        self.conn.commit()
+        try:
+            os.replace(self.storage_file, f"{self.storage_file}.migrated")
+        except Exception as e:
+            logger.warning(f"重命名旧课程数据文件失败: {e}")
+
+    def _get_meta_value(self, key: str) -> Any:
+        row = self.conn.execute(
+            "SELECT value FROM snapshot_meta WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_meta_value(self, key: str, value: Any):
+        self.conn.execute(
+            "INSERT INTO snapshot_meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False)),
+        )
+
+    @staticmethod
+    def _course_row(course: Dict[str, Any], data: str, now: float) -> Tuple:
+        """将课程转换为数据库行"""
+        return (
+            str(course.get("id")),
+            course.get("sign_status"),
+            (course.get("transcript_index") or {}).get("transcript_name", ""),
+            (course.get("transcript_index_type") or {}).get("transcript_type_name", ""),
+            course.get("sign_start_time"),
+            course.get("sign_end_time"),
+            course.get("sign_in_start_time"),
+            course.get("sign_out_end_time"),
+            data,
+            now,
+            now,
+        )
+
+    def _persist(self, courses_data: Dict[str, Any]) -> bool:
+        """
+        将课程数据写入数据库
+
+        只插入或更新内容发生变化的课程，不再出现的课程标记为下架（保留历史）；
+        仍在架课程的 last_seen 用一条语句统一刷新为本次保存时间。
+
+        与上次写入的内容（内存中）对比，与上次是同一个课程对象时不再序列化。
+
+        Args:
+            courses_data: 课程数据（完整的API响应）
+
+        Returns:
+            是否保存成功
+        """
+        with self._lock:
+            try:
+                now = time.time()
+                items = [course for course in courses_data.get("items", []) if course.get("id")]
+                if self._persisted is None:
+                    self._persisted = {
+                        row[0]: (None, row[1])
+                        for row in self.conn.execute("SELECT id, data FROM courses WHERE active = 1")
+                    }
+                existing = self._persisted
+
+                persisted = {}
+                changed_rows = []
+                for course in items:
+                    course_id = str(course.get("id"))
+                    previous = existing.get(course_id)
+                    if previous is not None and previous[0] is course:
+                        persisted[course_id] = previous
+                        continue
+                    data = json.dumps(course, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+                    persisted[course_id] = (course, data)
+                    if previous is None or previous[1] != data:
+                        changed_rows.append(self._course_row(course, data, now))
+
+                removed_ids = [(now, course_id) for course_id in existing if course_id not in persisted]
+
+                with self.conn:
+                    self.conn.executemany(
+                        """
+                        INSERT INTO courses (
+                            id, sign_status, category, type, sign_start_time, sign_end_time,
+                            sign_in_start_time, sign_out_end_time, data, first_seen, last_seen
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(id) DO UPDATE SET
+                            sign_status = excluded.sign_status,
+                            category = excluded.category,
+                            type = excluded.type,
+                            sign_start_time = excluded.sign_start_time,
+                            sign_end_time = excluded.sign_end_time,
+                            sign_in_start_time = excluded.sign_in_start_time,
+                            sign_out_end_time = excluded.sign_out_end_time,
+                            data = excluded.data,
+                            active = 1,
+                            last_seen = excluded.last_seen
+                        """,
+                        changed_rows,
+                    )
+                    self.conn.executemany(
+                        "UPDATE courses SET active = 0, last_seen = ? WHERE id = ?",
+                        removed_ids,
+                    )
+                    self.conn.execute("UPDATE courses SET last_seen = ? WHERE active = 1", (now,))
+                    extra = {k: v for k, v in courses_data.items() if k != "items"}
+                    self._set_meta_value("snapshot", extra)
+                    self._set_meta_value("snapshot_time", now)
+                self._persisted = persisted
+
+                logger.debug(
+                    f"课程数据已保存到: {self.db_file} "
+                    f"({len(changed_rows)} 行更新, {len(removed_ids)} 行下架)"
+                )
+                self._save_meta()
+                return True
+            except Exception as e:
+                logger.error(f"保存课程数据失败: {e}")
+                return False
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        从数据库读取课程数据
+
+        Returns:
+            课程数据，如果不存在则返回None
+        """
+        with self._lock:
+            try:
+                snapshot = self._get_meta_value("snapshot")
+                if snapshot is None:
+                    logger.debug("课程数据不存在")
+                    return None
+                rows = self.conn.execute(
+                    "SELECT id, data FROM courses WHERE active = 1 ORDER BY first_seen DESC, rowid ASC"
+                ).fetchall()
+                items = []
+                persisted = {}
+                for course_id, text in rows:
+                    course = json.loads(text)
+                    items.append(course)
+                    persisted[course_id] = (course, text)
+                self._persisted = persisted
+                data = dict(snapshot, items=items)
+                logger.debug(f"已加载课程数据: {len(rows)} 个课程")
+                return data
+            except Exception as e:
+                logger.error(f"加载课程数据失败: {e}")
+                return None
+
+    def find_new_courses(self, old_courses: List[Dict[str, Any]], new_courses: List[Dict[str, Any]], status_filter: List[int]) -> List[Dict[str, Any]]:
+        """
+        找出新增的课程（通过主键索引查询已知ID）
+
+        Args:
+            old_courses: 旧课程列表（仅用于判断是否首次运行）
+            new_courses: 新课程列表
+            status_filter: 状态过滤
+
+        Returns:
+            新增的课程列表
+        """
+        with self._lock:
+            if not old_courses:
+                logger.info("首次运行，不报告新课程")
+                return []
+
+            candidates = [
+                course for course in new_courses
+                if course.get("sign_status") in status_filter and course.get("id")
+            ]
+            known_ids = set()
+            candidate_ids = [str(course.get("id")) for course in candidates]
+            for start in range(0, len(candidate_ids), self.ID_BATCH_SIZE):
+                batch = candidate_ids[start:start + self.ID_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                known_ids.update(
+                    row[0] for row in self.conn.execute(
+                        f"SELECT id FROM courses WHERE active = 1 AND id IN ({placeholders})",
+                        batch,
+                    )
+                )
+
+            new_items = [course for course in candidates if str(course.get("id")) not in known_ids]
+            if new_items:
+                logger.info(f"发现 {len(new_items)} 个新课程")
+            return new_items
+
+    def clear_storage(self) -> bool:
+        """
+        清空存储的课程数据
+
+        Returns:
+            是否清空成功
+        """
+        self._snapshot = None
+        self._courses_by_id = {}
+        self._fingerprints = {}
+        with self._lock:
+            try:
+                with self.conn:
+                    self.conn.execute("DELETE FROM courses")
+                    self.conn.execute("DELETE FROM snapshot_meta WHERE key != 'migrated_from_json'")
+                self._persisted = {}
+                logger.info("已清空课程数据")
+                return True
+            except Exception as e:
+                logger.error(f"清空课程数据失败: {e}")
+                return False
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
@@ -0,0 +1,107 @@
+# /astrbot_plugin_class2_notify/utils/file_utils.py
+
+import os
+import json
+import tempfile
+from typing import Any
+
+
+def fsync_dir(dir_path: str) -> None:
+    """同步目录项，确保新建、替换或删除的文件名已落盘"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    dir_fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+# 分段序列化时每段的列表元素数
+JSON_CHUNK_SIZE = 200
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps_json_chunked(data: Any) -> str:
+    """
+    紧凑序列化JSON，结果与一次 json.dumps 相同
+
+    顶层字典中的列表分段编码：单次 json.dumps 在返回前一直持有GIL，
+    即使在工作线程中调用，序列化大快照时也会阻塞事件循环。
+
+    Args:
+        data: 要序列化的数据
+
+    Returns:
+        JSON文本
+    """
+    if not isinstance(data, dict) or not all(isinstance(key, str) for key in data):
+        return _dumps(data)
+    parts = []
+    for key, value in data.items():
+        parts.append("," if parts else "{")
+        parts.append(_dumps(key))
+        parts.append(":")
+        if isinstance(value, list) and len(value) > JSON_CHUNK_SIZE:
+            parts.append("[")
+            for start in range(0, len(value), JSON_CHUNK_SIZE):
+                if start:
+                    parts.append(",")
+                parts.append(_dumps(value[start:start + JSON_CHUNK_SIZE])[1:-1])
+            parts.append("]")
+        else:
+            parts.append(_dumps(value))
+    parts.append("}" if parts else "{}")
+    return "".join(parts)
+
+
+def write_json_atomic(path: str, data: Any, durability: str = "file") -> None:
+    """
+    原子地写入JSON文件（紧凑序列化）
+
+    Args:
+        path: 目标文件路径
+        data: 要写入的数据
+        durability: 持久化级别，见 write_bytes_atomic
+    """
+    payload = dumps_json_chunked(data).encode("utf-8")
+    write_bytes_atomic(path, payload, durability)
+
+
+def write_bytes_atomic(path: str, payload: bytes, durability: str = "file") -> None:
+    """
+    原子地写入文件
+
+    先写入同目录的临时文件，再用 os.replace 替换目标文件，
+    写入中途崩溃不会破坏原文件。durability 决定是否 fsync：
+    none 不同步，file 同步文件内容，full 同时同步目录项。
+
+    Args:
+        path: 目标文件路径
+        payload: 文件内容
+        durability: 持久化级别
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            if durability in ("file", "full"):
+                f.flush()
+                os.fsync(f.fileno())
+        # mkstemp 创建的文件权限为0600，恢复为普通文件权限
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if durability == "full":
+        fsync_dir(os.path.dirname(path))
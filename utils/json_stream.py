@@ -0,0 +1,147 @@
+# /astrbot_plugin_class2_notify/utils/json_stream.py
+
+import json
+import codecs
+from typing import Any, List, Optional, Sequence
+
+
+class JsonArrayStream:
+    """
+    增量解析JSON文档中指定路径上的数组（如 data.items），逐个产出数组元素
+
+    数组之外的部分（文档骨架，通常只有几个字段）逐字符扫描并保留，
+    数组元素用 json 的C解码器逐个解析后交给调用方，不在内存中保留整个响应体。
+    """
+
+    _WHITESPACE = " \t\r\n"
+    # 数字中可能出现的字符
+    _NUMBER_CHARS = "0123456789.eE+-"
+
+    def __init__(self, path: Sequence[str]):
+        self.path = tuple(path)
+        self.found = False
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        # 文档骨架（目标数组的元素被剔除）
+        self._skeleton: List[str] = []
+        # 容器栈: [类型, 当前键]
+        self._stack: List[List[Optional[str]]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._in_array = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        输入一段响应体
+
+        Args:
+            chunk: 响应体片段（可在任意字节处切分）
+
+        Returns:
+            本段中解析完成的数组元素
+        """
+        self._buffer += self._text_decoder.decode(chunk)
+        return self._consume(final=False)
+
+    def close(self) -> Any:
+        """
+        结束输入
+
+        Returns:
+            去掉目标数组元素后的文档（目标数组为空列表）
+
+        Raises:
+            ValueError: 文档不完整或不是合法JSON
+        """
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        remaining = self._consume(final=True)
+        if remaining or self._in_array or self._in_string or self._stack:
+            raise ValueError("JSON文档不完整")
+        return json.loads("".join(self._skeleton))
+
+    def _consume(self, final: bool) -> List[Any]:
+        items = []
+        buffer = self._buffer
+        pos = 0
+        length = len(buffer)
+        while pos < length:
+            if self._in_array:
+                pos = self._consume_items(buffer, pos, final, items)
+                if self._in_array:
+                    # 剩余部分是不完整的元素，等待更多数据
+                    break
+            else:
+                pos = self._consume_skeleton(buffer, pos)
+        self._buffer = buffer[pos:]
+        return items
+
+    def _consume_items(self, buffer: str, pos: int, final: bool, items: List[Any]) -> int:
+        """在目标数组内逐个解码元素，返回处理到的位置"""
+        length = len(buffer)
+        while True:
+            while pos < length and (buffer[pos] in self._WHITESPACE or buffer[pos] == ","):
+                pos += 1
+            if pos >= length:
+                return pos
+            if buffer[pos] == "]":
+                self._skeleton.append("]")
+                self._in_array = False
+                return pos + 1
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                return pos
+            if not final and not isinstance(item, (dict, list)) and not buffer[end:].strip(self._NUMBER_CHARS):
+                # 标量之后只剩数字字符时可能是被切断的数字（如 "3500." 只解出了 3500），等待后续数据
+                return pos
+            items.append(item)
+            pos = end
+
+    def _consume_skeleton(self, buffer: str, pos: int) -> int:
+        """逐字符扫描数组之外的部分，直到进入目标数组"""
+        length = len(buffer)
+        skeleton = self._skeleton
+        while pos < length:
+            char = buffer[pos]
+            pos += 1
+            skeleton.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = json.loads("".join(skeleton[self._string_start:]))
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = len(skeleton) - 1
+            elif char == ":":
+                if self._stack:
+                    self._stack[-1][1] = self._last_string
+            elif char == "{":
+                self._stack.append(["{", None])
+            elif char == "[":
+                if not self.found and self._at_target():
+                    self.found = True
+                    self._in_array = True
+                    return pos
+                self._stack.append(["[", None])
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+        return pos
+
+    def _at_target(self) -> bool:
+        if len(self._stack) != len(self.path):
+            return False
+        return all(
+            kind == "{" and key == expected
+            for (kind, key), expected in zip(self._stack, self.path)
+        )
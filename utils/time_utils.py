@@ -0,0 +1,68 @@
+# /astrbot_plugin_class2_notify/utils/time_utils.py
+
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Optional
+
+
+# 课程时间字段可能出现的格式
+TIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d %H:%M",
+    "%Y-%m-%d",
+)
+
+
+@lru_cache(maxsize=16384)
+def _parse_text(text: str) -> Optional[float]:
+    text = text.strip()
+    if not text:
+        return None
+    if text.isdigit():
+        value = int(text)
+        # 毫秒时间戳
+        return value / 1000 if value > 10 ** 11 else float(value)
+    for fmt in TIME_FORMATS:
+        try:
+            return time.mktime(time.strptime(text, fmt))
+        except ValueError:
+            continue
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return time.mktime(parsed.timetuple())
+    return parsed.timestamp()
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """
+    将课程中的时间字段解析为Unix时间戳（无时区的时间按本地时间处理）
+
+    Args:
+        value: 时间字符串或数字时间戳
+
+    Returns:
+        Unix时间戳（秒），无法解析时返回None
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 10 ** 11 else float(value)
+    return _parse_text(str(value))
+
+
+def format_duration(seconds: float) -> str:
+    """将秒数格式化为便于阅读的时长"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}秒"
+    if seconds < 3600:
+        minutes, rest = divmod(seconds, 60)
+        return f"{minutes}分{rest}秒" if rest else f"{minutes}分钟"
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}小时{rest // 60}分" if rest >= 60 else f"{hours}小时"